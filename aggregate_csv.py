@@ -1,47 +1,79 @@
 """
 Fichier pour relier les infos de "code_smells_report.csv" et "chart-infos.csv"
 dans un fichier unique final "final_report.csv".
+
+La jointure est faite par pandas sur le nom de la chart normalisé (espaces
+en trop, casse), et les charts sans correspondance d'un côté ou de l'autre
+sont listées au lieu d'être ignorées silencieusement. Les métadonnées de
+"chart_infos.csv" sont converties une fois pour toutes à la lecture (étoiles
+en entier, "Days Ago" en nombre, virgule décimale comprise) et enregistrées,
+sous le nom de chart du calculateur, dans la table typée des résultats
+(`code_smells_results.sqlite`) dont la vue `final_report` est lue par les
+scripts compute_graphs*.py.
 """
-import csv
+import pandas as pd
+
+from results_store import ResultsStore
 
-CODE_SMELLS_FILE = "code_smells_report.csv"
 CHART_INFOS_FILE = "chart_infos.csv"
 OUTPUT_FILE = "final_report.csv"
 
-# --- Read chart_infos.csv into a dict keyed by Nom ---
-chart_infos = {}
 
-with open(CHART_INFOS_FILE, newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        chart_name = row.get("Nom")
-        if chart_name:
-            chart_infos[chart_name] = {
-                "stars": row.get("Etoiles"),
-                "days_ago": row.get("Days Ago"),
-                "origin": row.get("Provenance"),
-            }
-
-# --- Read code_smells_report.csv and join ---
-final_rows = []
-
-with open(CODE_SMELLS_FILE, newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        chart = row.get("Chart")
-
-        if chart in chart_infos:
-            info = chart_infos[chart]
-            final_rows.append({
-                "Chart": chart,
-                "stars": info["stars"],
-                "days_ago": info["days_ago"],
-                "origin": info["origin"],
-                "code_smells": row.get("Code Smells"),
-                "total_lines": row.get("Total Lines"),
-                "total_files": row.get("Total Files"),
-                "ratio": row.get("Ratio"),
-            })
+def normalize_chart_name(names):
+    """Clé de jointure : nom de chart sans espaces autour, en minuscules."""
+    return names.str.strip().str.casefold()
+
+
+def parse_numbers(values):
+    """Colonne de nombres de chart_infos.csv (virgule décimale, guillemets), NaN si vide."""
+    cleaned = values.str.replace(",", ".", regex=False).str.replace('"', "", regex=False).str.strip()
+    return pd.to_numeric(cleaned.replace("", None), errors="raise")
+
+
+# --- Read chart_infos.csv, with typed columns ---
+infos = pd.read_csv(CHART_INFOS_FILE, usecols=["Nom", "Etoiles", "Days Ago", "Provenance"], dtype=str, keep_default_na=False)
+infos = infos[infos["Nom"] != ""]
+infos = pd.DataFrame({
+    "Nom": infos["Nom"],
+    "key": normalize_chart_name(infos["Nom"]),
+    "stars": parse_numbers(infos["Etoiles"]).astype("Int64"),
+    "days_ago": parse_numbers(infos["Days Ago"]).astype("float64"),
+    "origin": infos["Provenance"],
+})
+
+duplicates = infos[infos.duplicated("key", keep="last")]["Nom"]
+if not duplicates.empty:
+    print(f"Charts présentes plusieurs fois dans {CHART_INFOS_FILE} (dernière ligne gardée) : {', '.join(duplicates)}")
+infos = infos.drop_duplicates("key", keep="last")
+
+# --- Read the results of code_smells_calculator.py and join ---
+store = ResultsStore()
+results = pd.read_sql_query(
+    "SELECT chart AS Chart, code_smells, total_lines, total_files, ratio FROM charts ORDER BY position",
+    store.connection,
+)
+results["key"] = normalize_chart_name(results["Chart"])
+
+merged = results.merge(infos, on="key", how="left", validate="many_to_one")
+matched = merged["Nom"].notna()
+
+missing_infos = merged.loc[~matched, "Chart"]
+if not missing_infos.empty:
+    print(f"Charts analysées absentes de {CHART_INFOS_FILE} : {', '.join(missing_infos)}")
+missing_results = infos.loc[~infos["key"].isin(results["key"]), "Nom"]
+if not missing_results.empty:
+    print(f"Charts de {CHART_INFOS_FILE} sans résultats : {', '.join(missing_results)}")
+
+# --- Store the typed metadata under the calculator's chart names ---
+chart_infos = {}
+for row in pd.concat([merged[matched].assign(Nom=merged["Chart"]), infos[~infos["key"].isin(results["key"])]]).itertuples():
+    chart_infos[row.Nom] = (
+        None if pd.isna(row.stars) else int(row.stars),
+        None if pd.isna(row.days_ago) else float(row.days_ago),
+        row.origin,
+    )
+store.put_chart_infos(chart_infos)
+store.close()
 
 # --- Write final_report.csv ---
 fieldnames = [
@@ -55,9 +87,6 @@ fieldnames = [
     "ratio"
 ]
 
-with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(final_rows)
+merged[matched][fieldnames].to_csv(OUTPUT_FILE, index=False)
 
 print(f"Final report written to {OUTPUT_FILE}")
@@ -0,0 +1,96 @@
+"""
+Mesure du temps de parcours d'une chart : les parcours séparés faits
+auparavant pour chaque chart (computeLinesOfChart, get_yaml_files,
+has_helper_file, puis templates/ pour include_followed_by_indent et
+namespaced_template_definitions) comparés à l'unique parcours os.scandir de
+DiskSource, dont walk/exists sont ensuite servis depuis la mémoire.
+
+    python bench_chart_walk.py [--repeat 50] [charts/kube-prometheus-stack charts/cilium ...]
+"""
+import os
+import time
+import argparse
+import statistics
+
+from chart_context import DiskSource, USEFUL_EXTENSIONS, YAML_EXTENSIONS
+
+DEFAULT_CHARTS = ["charts/kube-prometheus-stack", "charts/cilium"]
+
+
+def separate_walks(chart):
+    """Les cinq parcours indépendants d'une chart."""
+    useful = [os.path.join(root, f) for root, _, files in os.walk(chart) for f in files if f.endswith(USEFUL_EXTENSIONS)]
+    yaml_files = [os.path.join(root, f) for root, _, files in os.walk(chart) for f in files if f.endswith(YAML_EXTENSIONS)]
+
+    helper = None
+    for root, _, files in os.walk(chart):
+        if "_helpers.tpl" in files:
+            helper = os.path.join(root, "_helpers.tpl")
+            break
+
+    templates_dir = os.path.join(chart, "templates")
+    templates = []
+    for _ in range(2):
+        if os.path.exists(templates_dir):
+            templates = [os.path.join(root, f) for root, _, files in os.walk(templates_dir) for f in files]
+    return useful, yaml_files, helper, templates
+
+
+def single_scan(chart):
+    """Un seul parcours os.scandir, puis les mêmes requêtes servies par DiskSource."""
+    source = DiskSource()
+    manifest = source.scan(chart)
+    useful = [path for path, size, mtime in manifest if path.endswith(USEFUL_EXTENSIONS)]
+    yaml_files = [path for path in useful if path.endswith(YAML_EXTENSIONS)]
+
+    helper = None
+    for root, _, files in source.walk(chart):
+        if "_helpers.tpl" in files:
+            helper = os.path.join(root, "_helpers.tpl")
+            break
+
+    templates_dir = os.path.join(chart, "templates")
+    templates = []
+    for _ in range(2):
+        if source.exists(templates_dir):
+            templates = [os.path.join(root, f) for root, _, files in source.walk(templates_dir) for f in files]
+    return useful, yaml_files, helper, templates
+
+
+def measure(function, repeat, min_time=0, setup=None):
+    """
+    (min, médiane) des durées de `function()`, partagé par les scripts
+    bench_*.py : au moins `repeat` appels et `min_time` secondes. Avec
+    `setup`, chaque appel est `function(setup())` et seul `function` est
+    chronométré.
+    """
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < repeat or time.perf_counter() - start < min_time:
+        args = (setup(),) if setup is not None else ()
+        call_start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - call_start)
+    return min(timings), statistics.median(timings)
+
+
+def main(charts, repeat):
+    for chart in charts:
+        if separate_walks(chart) != single_scan(chart):
+            raise AssertionError(f"Les deux parcours de {chart} ne donnent pas les mêmes fichiers")
+
+        files = sum(len(files) for _, _, files in os.walk(chart))
+        before_min, before_median = measure(lambda: separate_walks(chart), repeat)
+        after_min, after_median = measure(lambda: single_scan(chart), repeat)
+        print(f"{chart} ({files} fichiers)")
+        print(f"  parcours séparés : min {before_min * 1000:.2f} ms, médiane {before_median * 1000:.2f} ms")
+        print(f"  parcours unique  : min {after_min * 1000:.2f} ms, médiane {after_median * 1000:.2f} ms")
+        print(f"  gain             : x{before_median / after_median:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare le parcours unique d'une chart aux parcours séparés.")
+    parser.add_argument("charts", nargs="*", default=DEFAULT_CHARTS, help="dossiers de charts à mesurer")
+    parser.add_argument("--repeat", type=int, default=50, help="nombre de mesures par chart")
+    args = parser.parse_args()
+    main(args.charts, args.repeat)
@@ -0,0 +1,333 @@
+"""
+Micro-benchmarks de chaque check de scripts/, de computeLinesOfChart et de
+get_yaml_files, sur des charts fixes :
+  - la plus petite, la médiane et la plus grosse chart de charts/ (taille
+    totale des fichiers .yaml/.yml/.tpl) ;
+  - des pires cas synthétiques (longs blocs de commentaires dans values.yaml,
+    imbrication profonde, nombreux templates, ligne très longue, nombreuses
+    dépendances) et une grande chart de synthetic_charts.py, écrits dans un
+    dossier temporaire.
+
+Chaque mesure part d'un ChartContext neuf, sans cache : le temps d'un check
+comprend donc la lecture des fichiers qu'il demande (et le passage des règles
+de line_rules, partagé en temps normal avec les autres checks). Le débit
+(ops/s) est calculé sur la médiane des mesures, et le pic de mémoire allouée
+(tracemalloc) sur un appel supplémentaire non chronométré, le ChartContext
+étant construit avant : seul ce qu'alloue le check (fichiers qu'il lit
+compris) est compté.
+
+Chaque exécution est ajoutée à `bench_history.json` avec le commit courant ;
+les mesures dont le débit a baissé de plus de `--threshold` depuis la
+précédente exécution sont signalées.
+
+    python bench_checks.py [--checks count_tabs,standard_labels] [--fixtures corpus:largest,synthetic:deep_values]
+"""
+import io
+import os
+import json
+import shutil
+import argparse
+import datetime
+import platform
+import subprocess
+import tempfile
+import contextlib
+import tracemalloc
+
+from chart_context import ChartContext, DiskSource, USEFUL_EXTENSIONS
+from check_registry import discover, select, parse_names
+from code_smells_calculator import CHARTS_FOLDER, run_check, computeLinesOfChart, get_yaml_files
+from synthetic_charts import ChartSpec, generate_chart
+from bench_chart_walk import measure
+
+HISTORY_FILE = "bench_history.json"
+
+# en dessous, la durée d'une mesure varie trop d'une exécution à l'autre pour y voir une régression
+REGRESSION_FLOOR_MS = 0.1
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def chart_size(chart):
+    return sum(size or 0 for path, size, mtime in DiskSource().scan(chart) if path.endswith(USEFUL_EXTENSIONS))
+
+
+def corpus_fixtures():
+    """Plus petite, médiane et plus grosse chart de charts/."""
+    charts = sorted(
+        (os.path.join(CHARTS_FOLDER, d) for d in os.listdir(CHARTS_FOLDER) if os.path.isdir(os.path.join(CHARTS_FOLDER, d))),
+        key=chart_size,
+    )
+    if not charts:
+        return {}
+    return {
+        "corpus:smallest": charts[0],
+        "corpus:median": charts[len(charts) // 2],
+        "corpus:largest": charts[-1],
+    }
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _chart_yaml(name, dependencies=0):
+    content = f"apiVersion: v2\nname: {name}\nversion: 1.0.0\n"
+    if dependencies:
+        content += "dependencies:\n" + "".join(
+            f"  - name: dep{i}\n    version: 1.{i}.0\n    repository: http://charts.example.com/{i}\n"
+            for i in range(dependencies)
+        )
+    return content
+
+
+def _values_comment_blocks(chart):
+    # chaque clé racine est suivie d'un long bloc de commentaires indentés avant son premier enfant
+    block = "".join(f"  # commentaire {i} de la clé\n" for i in range(200))
+    _write(os.path.join(chart, "Chart.yaml"), _chart_yaml("values-comment-blocks"))
+    _write(os.path.join(chart, "values.yaml"), "".join(f"key{k}:\n{block}  child: {k}\n" for k in range(200)))
+
+
+def _deep_values(chart):
+    lines = []
+    for tree in range(50):
+        lines.append(f"root{tree}:")
+        for depth in range(1, 60):
+            lines.append("  " * depth + f"level{depth}:")
+        lines.append("  " * 60 + "- password: secret")
+        lines.append("  " * 60 + "  token: abc")
+    _write(os.path.join(chart, "Chart.yaml"), _chart_yaml("deep-values"))
+    _write(os.path.join(chart, "values.yaml"), "\n".join(lines) + "\n")
+
+
+def _many_templates(chart):
+    _write(os.path.join(chart, "Chart.yaml"), _chart_yaml("many-templates"))
+    _write(os.path.join(chart, "values.yaml"), "image:\n  tag: latest\n")
+    helpers = "".join(
+        f'{{{{- define "{"chart." if i % 2 else ""}helper{i}" -}}}}\n\tvalue: {i}\n{{{{- end }}}}\n' for i in range(500)
+    )
+    _write(os.path.join(chart, "templates", "_helpers.tpl"), helpers)
+    for i in range(1000):
+        _write(os.path.join(chart, "templates", f"configmap{i}.yaml"), (
+            "apiVersion: v1\n"
+            "kind: ConfigMap\n"
+            "metadata:\n"
+            f"  name: configmap{i}\n"
+            "  labels:\n"
+            f'{{{{ include "helper{i % 500}" . }}}}\n'
+            "data:\n"
+            f"  password: secret{i}\n"
+            f'  url: "http://example.com/{i}" # repository\n'
+        ))
+
+
+def _long_line(chart):
+    _write(os.path.join(chart, "Chart.yaml"), _chart_yaml("long-line"))
+    _write(os.path.join(chart, "values.yaml"), "key: " + "x" * (2 << 20) + "\n")
+    _write(os.path.join(chart, "templates", "long.yaml"), '{{ include "long" . }} ' * 20000 + "\n")
+
+
+def _many_dependencies(chart):
+    _write(os.path.join(chart, "Chart.yaml"), _chart_yaml("many-dependencies", dependencies=2000))
+
+
+def _generated(chart):
+    # chart synthétique de grande taille avec toutes les mauvaises pratiques (voir synthetic_charts.py)
+    generate_chart(chart, ChartSpec(
+        "generated", templates=300, values_keys=500, nested_keys=250, depth=8, defines=200,
+        non_namespaced_defines=50, includes_without_indent=50, tabs=50, configmap_secrets=50,
+        dependencies=50, http_repositories=10, nonrange_dependencies=10, unlabeled_templates=30,
+    ))
+
+
+SYNTHETIC = {
+    "synthetic:values_comment_blocks": _values_comment_blocks,
+    "synthetic:deep_values": _deep_values,
+    "synthetic:many_templates": _many_templates,
+    "synthetic:long_line": _long_line,
+    "synthetic:many_dependencies": _many_dependencies,
+    "synthetic:generated": _generated,
+}
+
+
+def synthetic_fixtures(folder):
+    fixtures = {}
+    for name, build in SYNTHETIC.items():
+        chart = os.path.join(folder, name.split(":", 1)[1])
+        build(chart)
+        fixtures[name] = chart
+    return fixtures
+
+
+# -------------------------
+# Mesures
+# -------------------------
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def quiet_check(check, chart):
+    def call(context):
+        with contextlib.redirect_stdout(io.StringIO()): # détail des violations affiché par certains checks
+            run_check(check, chart, context)
+    return call
+
+
+def targets(checks, chart):
+    """
+    (nom, préparation non chronométrée ou None, fonction chronométrée) de
+    chaque élément mesuré sur `chart`. Le ChartContext d'un check est
+    construit hors de la mesure : seuls les fichiers lus par le check sont
+    comptés.
+    """
+    entries = [(info.name, lambda: ChartContext(chart), quiet_check(info.load(), chart)) for info in checks]
+    entries.append(("computeLinesOfChart", None, lambda: computeLinesOfChart(chart)))
+    entries.append(("get_yaml_files", None, lambda: get_yaml_files(chart)))
+    return entries
+
+
+def run(fixtures, checks, repeat, min_time):
+    results = []
+    for fixture, chart in fixtures.items():
+        print(f"{fixture} ({chart})")
+        for name, setup, function in targets(checks, chart):
+            median = measure(function, repeat, min_time, setup)[1]
+            args = (setup(),) if setup is not None else () # ChartContext construit avant de suivre la mémoire
+            peak = peak_memory(lambda: function(*args))
+            results.append({
+                "fixture": fixture,
+                "target": name,
+                "median_ms": median * 1000,
+                "ops_per_sec": 1 / median if median > 0 else None,
+                "peak_kib": peak / 1024,
+            })
+            print(f"  {name:<35} {median * 1000:10.3f} ms  {1 / median if median > 0 else 0:10.1f} ops/s  {peak / 1024:10.1f} Kio")
+    return results
+
+
+# -------------------------
+# Historique
+# -------------------------
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def report_regressions(previous, results, threshold):
+    """
+    Mesures dont le débit a baissé de plus de `threshold` depuis l'exécution
+    précédente (hors mesures de moins de REGRESSION_FLOOR_MS).
+    """
+    before = {(r["fixture"], r["target"]): r["ops_per_sec"] for r in previous["results"]}
+    regressions = []
+    for result in results:
+        old = before.get((result["fixture"], result["target"]))
+        new = result["ops_per_sec"]
+        if result["median_ms"] < REGRESSION_FLOOR_MS:
+            continue
+        if old and new and new < old * (1 - threshold):
+            regressions.append((result["fixture"], result["target"], old, new))
+
+    commit = previous.get("commit") or "?"
+    if not regressions:
+        print(f"\nAucune régression de plus de {threshold:.0%} depuis l'exécution du {previous['date']} ({commit}).")
+        return
+    print(f"\nRégressions de plus de {threshold:.0%} depuis l'exécution du {previous['date']} ({commit}) :")
+    for fixture, target, old, new in regressions:
+        print(f"  - {fixture} / {target} : {old:.1f} → {new:.1f} ops/s ({new / old - 1:+.0%})")
+
+
+def main(check_names, fixture_names, repeat, min_time, history_path, threshold, save):
+    checks = select(discover(), check_names)
+    folder = tempfile.mkdtemp(prefix="bench_checks_")
+    try:
+        fixtures = {**corpus_fixtures(), **synthetic_fixtures(folder)}
+        if fixture_names:
+            unknown = [name for name in fixture_names if name not in fixtures]
+            if unknown:
+                raise ValueError(f"Fixtures inconnues : {', '.join(unknown)} (disponibles : {', '.join(fixtures)})")
+            fixtures = {name: fixtures[name] for name in fixture_names}
+        results = run(fixtures, checks, repeat, min_time)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    history = load_history(history_path)
+    if history:
+        report_regressions(history[-1], results, threshold)
+    if save:
+        history.append({
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": current_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        })
+        tmp_path = f"{history_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+        os.replace(tmp_path, history_path)
+        print(f"Mesures ajoutées à {history_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le temps et la mémoire de chaque check sur des charts fixes.")
+    parser.add_argument(
+        "--checks",
+        help="liste de checks à mesurer, séparés par des virgules (défaut : tous)"
+    )
+    parser.add_argument(
+        "--fixtures",
+        help="charts mesurées, séparées par des virgules (corpus:smallest, corpus:median, corpus:largest, "
+             f"{', '.join(SYNTHETIC)} ; défaut : toutes)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="nombre minimal de mesures par check et par chart"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="durée minimale (en secondes) des mesures de chaque check sur chaque chart"
+    )
+    parser.add_argument(
+        "--history",
+        default=HISTORY_FILE,
+        help=f"fichier JSON de l'historique des mesures (défaut : {HISTORY_FILE})"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="baisse de débit signalée comme régression (défaut : 0.10, soit 10%%)"
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="compare à la dernière exécution sans ajouter les mesures à l'historique"
+    )
+    args = parser.parse_args()
+    try:
+        main(parse_names(args.checks), parse_names(args.fixtures), args.repeat, args.min_time, args.history, args.threshold, not args.no_save)
+    except ValueError as e:
+        parser.error(str(e))
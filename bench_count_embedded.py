@@ -0,0 +1,77 @@
+"""
+Mesure du comptage des objets imbriqués de values.yaml : l'ancienne
+implémentation, qui cherche depuis chaque clé racine sa première ligne
+indentée, comparée au parcours unique de scripts/count_embedded.py (qui
+calcule en plus l'histogramme des profondeurs). Par défaut, les plus gros
+fichiers values.yaml de charts/ sont mesurés.
+
+    python bench_count_embedded.py [--repeat 50] [--top 5] [charts/cilium/values.yaml ...]
+"""
+import os
+import sys
+import glob
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from count_embedded import scan_values_text
+from bench_chart_walk import measure
+
+
+def forward_scan_count(yaml_content):
+    """Implémentation précédente de count_embedded_objects_from_text."""
+    embedded_count = 0
+    lines = yaml_content.split('\n')
+
+    for i, line in enumerate(lines):
+        stripped = line.lstrip()
+        if not stripped or stripped.startswith('#'):
+            continue
+
+        if not line.startswith(' ') and not line.startswith('\t'):
+            if ':' in line and not stripped.startswith('-'):
+                for j in range(i + 1, len(lines)):
+                    next_line = lines[j]
+                    next_stripped = next_line.lstrip()
+                    if not next_stripped:
+                        continue
+                    if len(next_line) - len(next_line.lstrip()) > 0:
+                        if next_stripped.startswith('#'):
+                            continue
+                        else:
+                            embedded_count += 1
+                            break
+                    else:
+                        break
+
+    return embedded_count
+
+
+def biggest_values_files(top):
+    paths = glob.glob("charts/**/values*.yaml", recursive=True)
+    return sorted(paths, key=os.path.getsize, reverse=True)[:top]
+
+
+def main(paths, repeat):
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        scan = scan_values_text(content)
+        if forward_scan_count(content) != scan["embedded"]:
+            raise AssertionError(f"Les deux implémentations ne comptent pas les mêmes objets imbriqués dans {path}")
+
+        before_min, before_median = measure(lambda: forward_scan_count(content), repeat)
+        after_min, after_median = measure(lambda: scan_values_text(content), repeat)
+        print(f"{path} ({content.count(chr(10)) + 1} lignes, {scan['embedded']} objets imbriqués, profondeur max {scan['max_depth']})")
+        print(f"  profondeurs      : {', '.join(f'{depth}: {count}' for depth, count in enumerate(scan['depths']))}")
+        print(f"  recherche avant  : min {before_min * 1000:.2f} ms, médiane {before_median * 1000:.2f} ms")
+        print(f"  parcours unique  : min {after_min * 1000:.2f} ms, médiane {after_median * 1000:.2f} ms")
+        print(f"  rapport          : x{before_median / after_median:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare le parcours unique de count_embedded à l'ancienne recherche en avant.")
+    parser.add_argument("paths", nargs="*", help="fichiers values.yaml à mesurer (défaut : les plus gros de charts/)")
+    parser.add_argument("--repeat", type=int, default=50, help="nombre de mesures par fichier")
+    parser.add_argument("--top", type=int, default=5, help="nombre de fichiers de charts/ mesurés par défaut")
+    args = parser.parse_args()
+    main(args.paths or biggest_values_files(args.top), args.repeat)
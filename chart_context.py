@@ -0,0 +1,525 @@
+"""
+Contexte partagé d'une chart Helm : chaque fichier utile (.yaml, .yml, .tpl)
+est lu au plus une fois en mémoire, à la première demande, puis réutilisé
+par le calcul du nombre de lignes et par tous les checks de `scripts/`.
+Le Chart.yaml de la chart et de chacune de ses sous-charts est analysé une
+seule fois (voir ChartMetadata).
+"""
+import os
+import codecs
+from fnmatch import fnmatch
+from typing import NamedTuple
+
+import yaml
+
+from smell_cache import blob_id
+
+USEFUL_EXTENSIONS = (".yaml", ".yml", ".tpl")
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+# Taille des morceaux lus pour compter les lignes sans charger le fichier
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+
+# Classes de fichiers d'une chart (ou d'une sous-chart de son dossier charts/),
+# que les checks déclarent dans FILES pour ne recevoir que ces fichiers
+CHART_YAML = "chart_yaml"   # Chart.yaml (hors templates/)
+VALUES = "values"           # values*.yaml (hors templates/)
+TEMPLATE = "template"       # templates/**/*.yaml
+HELPER = "helper"           # *.tpl
+CRD = "crd"                 # crds/**/*.yaml
+OTHER = "other"             # tous les autres .yaml (ci/, tests ...)
+YAML_ROLES = (CHART_YAML, VALUES, TEMPLATE, CRD, OTHER)
+
+# Chargeur YAML de libyaml (C) quand PyYAML a été compilé avec, sinon le chargeur Python
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class ManifestEntry(NamedTuple):
+    """Un fichier de la chart, tel que relevé par l'unique parcours de son dossier."""
+    path: str
+    size: int | None        # None si inconnu (chart lue depuis git, lien cassé)
+    mtime: float | None
+    extension: str
+    role: str | None        # classe du fichier, None pour les fichiers non utiles
+
+
+def file_role(chart_path, path):
+    """
+    Classe d'un fichier utile : les fichiers de charts/<nom>/ sont classés
+    par rapport à la sous-chart <nom>, récursivement. Tout fichier .yaml de
+    templates/ est un template, même nommé values*.yaml ou Chart.yaml.
+    """
+    parts = os.path.relpath(path, chart_path).split(os.sep)
+    while len(parts) > 2 and parts[0] == "charts":
+        parts = parts[2:]
+
+    name = parts[-1]
+    if name.endswith(".tpl"):
+        return HELPER
+    if len(parts) > 1 and parts[0] == "templates":
+        return TEMPLATE
+    if name == "Chart.yaml":
+        return CHART_YAML
+    if fnmatch(name, "values*.yaml") or fnmatch(name, "values*.yml"):
+        return VALUES
+    if len(parts) > 1 and parts[0] == "crds":
+        return CRD
+    return OTHER
+
+
+class ChartMetadata:
+    """
+    Contenu d'un Chart.yaml, analysé une fois par contenu (blob) puis
+    partagé par les checks. `data` est le document YAML tel quel (None si
+    le fichier est vide) et `error` l'erreur de lecture ou d'analyse
+    éventuelle ; name et dependencies valent None quand le champ manque ou
+    que le document n'est pas un dictionnaire.
+    """
+
+    def __init__(self, path, data=None, error=None):
+        self.path = path
+        self.data = data
+        self.error = error
+
+    def _field(self, key):
+        return self.data.get(key) if isinstance(self.data, dict) else None
+
+    @property
+    def name(self):
+        return self._field("name")
+
+    @property
+    def dependencies(self):
+        return self._field("dependencies")
+
+
+def parse_chart_yaml(path, text):
+    try:
+        return ChartMetadata(path, yaml.load(text, Loader=YAML_LOADER))
+    except yaml.YAMLError as e:
+        return ChartMetadata(path, error=e)
+
+
+def count_lines(chunks):
+    """
+    Nombre de lignes d'un contenu UTF-8 fourni par morceaux d'octets, égal à
+    len(readlines()) en mode texte (fins de ligne \\n, \\r\\n et \\r, dernière
+    ligne comptée même sans fin de ligne), sans construire le texte ni les
+    lignes. Lève UnicodeDecodeError comme la lecture en mode texte si le
+    contenu n'est pas de l'UTF-8 valide.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    lines = 0
+    last = b""  # dernier octet du morceau précédent
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # seuls les morceaux non ASCII (ou la suite d'un caractère coupé) sont validés
+        if not chunk.isascii() or decoder.getstate()[0]:
+            decoder.decode(chunk)
+        lines += chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+        if last == b"\r" and chunk[:1] == b"\n":
+            lines -= 1  # \r\n coupé entre deux morceaux
+        last = chunk[-1:]
+    decoder.decode(b"", final=True)
+    if last and last not in (b"\n", b"\r"):
+        lines += 1
+    return lines
+
+
+def _chunks(data):
+    for start in range(0, len(data), LINE_COUNT_CHUNK_SIZE):
+        yield data[start:start + LINE_COUNT_CHUNK_SIZE]
+
+
+def _read_chunks(path):
+    with open(path, "rb") as f:
+        while chunk := f.read(LINE_COUNT_CHUNK_SIZE):
+            yield chunk
+
+
+def _universal_newlines(text):
+    """Reproduit la traduction des fins de ligne faite par open(..., "r")."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class ChartFile:
+    """
+    Un fichier d'une chart : octets bruts, texte décodé en UTF-8 et lignes
+    (sans fin de ligne, découpées comme readlines()).
+    Le contenu est soit fourni directement, soit chargé à la demande par
+    `loader` (lecture d'un blob git par exemple). `reader`, s'il est fourni,
+    retourne le contenu par morceaux sans le garder en mémoire : le nombre de
+    lignes d'un fichier que personne d'autre ne lit est compté ainsi.
+    Une erreur de lecture ou de décodage est conservée et relevée à l'accès,
+    pour que chaque check garde son propre traitement d'erreur.
+    """
+
+    def __init__(self, path, data=None, error=None, blob=None, loader=None, reader=None):
+        self.path = path
+        self.error = error
+        self._data = data
+        self._loader = loader
+        self._reader = reader
+        self._blob = blob
+        self._text = None
+        self._lines = None
+        self.line_hits = None # (règles, résultats) du dernier passage de line_rules.scan_file
+
+    @property
+    def data(self):
+        if self._data is None and self._loader is not None:
+            loader, self._loader = self._loader, None
+            try:
+                self._data = loader()
+            except Exception as e:
+                self.error = e
+        return self._data
+
+    @property
+    def blob(self):
+        """Identifiant git du contenu (clé du cache des résultats), None si illisible."""
+        if self._blob is None and self.data is not None:
+            self._blob = blob_id(self.data)
+        return self._blob
+
+    @property
+    def text(self):
+        if self._text is None:
+            data = self.data
+            if data is None:
+                raise self.error
+            try:
+                self._text = _universal_newlines(data.decode("utf-8"))
+            except UnicodeDecodeError as e:
+                self.error = e
+                raise
+        return self._text
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            lines = self.text.split("\n")
+            if lines[-1] == "":
+                lines.pop()  # readlines() ne produit pas de dernière ligne vide
+            self._lines = lines
+        return self._lines
+
+    @property
+    def line_count(self):
+        """len(lines), calculé sans découper le texte (voir count_lines)."""
+        if self._lines is not None:
+            return len(self._lines)
+        if self._text is not None:
+            return self._text.count("\n") + (1 if self._text and not self._text.endswith("\n") else 0)
+
+        if self._data is None and self._loader is not None and self._reader is not None:
+            chunks = self._reader()
+        elif self.data is not None:
+            chunks = _chunks(self.data)
+        else:
+            raise self.error
+        try:
+            return count_lines(chunks)
+        except OSError as e:
+            self.error = e
+            raise
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class DiskSource:
+    """
+    Accès aux fichiers d'une chart présente sur le disque. Le dossier de la
+    chart est parcouru une seule fois avec os.scandir (scan) ; walk et
+    exists répondent ensuite depuis ce parcours, sans nouvel appel système
+    pour les chemins qu'il couvre. `bytes_read` compte les octets lus dans
+    les fichiers (voir profiler.py).
+    """
+
+    def __init__(self):
+        self.dirs = {} # dossier -> (sous-dossiers, fichiers), comme les triplets de os.walk
+        self.bytes_read = 0
+
+    def scan(self, top):
+        """(chemin, taille, mtime) de chaque fichier sous `top`, dans l'ordre de os.walk."""
+        entries = []
+        self._scan(top, entries)
+        return entries
+
+    def _scan(self, top, entries):
+        try:
+            with os.scandir(top) as it:
+                scanned = list(it)
+        except OSError:
+            return # os.walk ignore lui aussi les dossiers illisibles
+
+        subdirs, files = [], []
+        self.dirs[os.path.normpath(top)] = (subdirs, files)
+        walk_into = []
+        for entry in scanned:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                subdirs.append(entry.name)
+                if not entry.is_symlink(): # os.walk ne suit pas les liens symboliques
+                    walk_into.append(os.path.join(top, entry.name))
+            else:
+                files.append(entry.name)
+                try:
+                    stat = entry.stat()
+                    entries.append((os.path.join(top, entry.name), stat.st_size, stat.st_mtime))
+                except OSError:
+                    entries.append((os.path.join(top, entry.name), None, None))
+
+        for path in walk_into:
+            self._scan(path, entries)
+
+    def walk(self, top):
+        if os.path.normpath(top) not in self.dirs:
+            return os.walk(top)
+        return self._walk(top)
+
+    def _walk(self, top):
+        subdirs, files = self.dirs[os.path.normpath(top)]
+        yield top, list(subdirs), list(files)
+        for subdir in subdirs:
+            path = os.path.join(top, subdir)
+            if os.path.normpath(path) in self.dirs:
+                yield from self._walk(path)
+
+    def exists(self, path):
+        parent, name = os.path.split(os.path.normpath(path))
+        node = self.dirs.get(parent)
+        if node is None or not name:
+            return os.path.exists(path)
+        return name in node[0] or name in node[1]
+
+    def _load(self, path):
+        data = _read_bytes(path)
+        self.bytes_read += len(data)
+        return data
+
+    def _load_chunks(self, path):
+        for chunk in _read_chunks(path):
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def open(self, path):
+        """Fichier du disque, lu à la première demande de son contenu."""
+        return ChartFile(path, loader=lambda: self._load(path), reader=lambda: self._load_chunks(path))
+
+
+class ChartContext:
+    """
+    Cache par chart : parcourt la chart une fois et expose le contenu de ses
+    fichiers utiles aux checks, chaque fichier étant lu à sa première
+    demande puis gardé en cache. Les fichiers demandés en dehors de ce
+    parcours sont lus et gardés de la même façon.
+
+    Les checks passent par `walk` et `exists` plutôt que par os.walk et
+    os.path.exists : la chart peut ainsi venir du disque (DiskSource) ou
+    directement des objets d'un dépôt git (voir git_snapshot), et n'est
+    parcourue qu'une fois (`manifest`).
+
+    Si un SmellCache est fourni, les résultats des checks par fichier sont
+    réutilisés d'une exécution à l'autre tant que le fichier et le check
+    n'ont pas changé (voir run_file_check). Un BlobMemo permet en plus de
+    partager en mémoire ces résultats et le nombre de lignes de chaque blob
+    entre les commits d'un même dépôt, ainsi que les résultats des checks
+    par chart tant que ce qu'ils ont lu n'a pas changé (voir run_chart_check).
+    """
+
+    def __init__(self, chart_path, cache=None, source=None, memo=None):
+        self.chart = chart_path
+        self.cache = cache
+        self.memo = memo
+        self.source = source if source is not None else DiskSource()
+        self.files = {}
+        self._metadata = memo.metadata if memo is not None else {} # blob -> ChartMetadata
+        self._inputs = None # entrées lues par le check par chart en cours
+        self._lines_by_extension = None
+
+        # unique parcours de la chart : manifeste typé de tous ses fichiers,
+        # dont sont tirées les listes de fichiers utiles des checks
+        self.manifest = []
+        for file_path, size, mtime in self.source.scan(chart_path):
+            role = None
+            if file_path.endswith(USEFUL_EXTENSIONS):
+                self.files[file_path] = self.source.open(file_path)
+                role = file_role(chart_path, file_path)
+            self.manifest.append(ManifestEntry(file_path, size, mtime, os.path.splitext(file_path)[1], role))
+
+        self.useful_files = [entry.path for entry in self.manifest if entry.role is not None]
+        self.yaml_files = self.files_for(YAML_ROLES)
+
+    def files_for(self, roles):
+        """Fichiers utiles des classes `roles`, dans l'ordre du parcours de la chart."""
+        return [entry.path for entry in self.manifest if entry.role in roles]
+
+    def walk(self, top):
+        if self._inputs is not None:
+            self._inputs.add(("listing", top))
+        return self.source.walk(top)
+
+    def exists(self, path):
+        if self._inputs is not None:
+            self._inputs.add(("exists", path))
+        return self.source.exists(path)
+
+    def get(self, path):
+        if self._inputs is not None:
+            self._inputs.add(("blob", path))
+        chart_file = self.files.get(path)
+        if chart_file is None:
+            chart_file = self.source.open(path)
+            self.files[path] = chart_file
+        return chart_file
+
+    def read_bytes(self, path):
+        chart_file = self.get(path)
+        if chart_file.data is None:
+            raise chart_file.error
+        return chart_file.data
+
+    def text(self, path):
+        return self.get(path).text
+
+    def lines(self, path):
+        return self.get(path).lines
+
+    def line_count(self, path):
+        """Nombre de lignes du fichier, mémorisé par blob si un BlobMemo est fourni."""
+        chart_file = self.get(path)
+        blob = chart_file.blob if self.memo is not None else None
+        if blob is None:
+            return chart_file.line_count
+
+        count = self.memo.line_counts.get(blob)
+        if count is None:
+            count = chart_file.line_count
+            self.memo.line_counts[blob] = count
+        return count
+
+    def chart_yaml(self, path):
+        """
+        ChartMetadata du Chart.yaml `path`, analysé une seule fois par
+        contenu : deux Chart.yaml identiques (même chart d'un commit à
+        l'autre avec un BlobMemo) partagent la même analyse.
+        """
+        chart_file = self.get(path)
+        blob = chart_file.blob
+        metadata = self._metadata.get(blob) if blob is not None else None
+        if metadata is None:
+            try:
+                metadata = parse_chart_yaml(path, chart_file.text)
+            except Exception as e:
+                return ChartMetadata(path, error=e)
+            self._metadata[blob] = metadata
+        return metadata
+
+    def metadata(self, root=None):
+        """
+        ChartMetadata de la chart (ou de la sous-chart de racine `root`),
+        None si elle n'a pas de Chart.yaml.
+        """
+        chart_file = os.path.join(root if root is not None else self.chart, "Chart.yaml")
+        if not self.exists(chart_file):
+            return None
+        return self.chart_yaml(chart_file)
+
+    def run_file_check(self, check_file, path):
+        """
+        Applique `check_file(path, context)` au fichier, en passant par la
+        mémoire des blobs puis par le cache des résultats lorsqu'ils sont
+        activés. `check_file` ne doit dépendre que du contenu du fichier et
+        retourner un résultat sérialisable en JSON.
+        """
+        if self.memo is None and self.cache is None:
+            return check_file(path, self)
+        blob = self.get(path).blob
+        if blob is None:
+            return check_file(path, self)
+
+        if self.memo is not None:
+            result = self.memo.get(blob, check_file)
+            if result is not None:
+                return result
+
+        result = self.cache.get(blob, check_file) if self.cache is not None else None
+        if result is None:
+            result = check_file(path, self)
+            if self.cache is not None:
+                self.cache.put(blob, check_file, result)
+
+        if self.memo is not None:
+            self.memo.put(blob, check_file, result)
+        return result
+
+    def _input_value(self, kind, path):
+        if kind == "listing":
+            return self.source.listing(path)
+        if kind == "exists":
+            return self.source.exists(path)
+        if kind == "blob":
+            return self.source.blob(path)
+        return tuple(self.yaml_files)
+
+    def run_chart_check(self, check, yaml_files):
+        """
+        Applique un check par chart (`check(yaml_files, chart, context)`).
+        Avec un BlobMemo et une source git, les entrées lues par le check
+        (fichiers reçus, contenus lus, existence de chemins, liste des
+        fichiers d'un dossier) sont notées : au commit suivant, le résultat est réutilisé si aucune de ces
+        entrées n'a changé.
+        """
+        if self.memo is None or not hasattr(self.source, "blob"):
+            return check(yaml_files, self.chart, self)
+
+        key = (self.chart, check)
+        previous = self.memo.chart_results.get(key)
+        if previous is not None:
+            files, inputs, result = previous
+            if files == tuple(yaml_files) and all(self._input_value(kind, path) == value for (kind, path), value in inputs):
+                self.memo.hits += 1
+                return result
+        self.memo.misses += 1
+
+        self._inputs = {("yaml_files", None)}
+        try:
+            result = check(yaml_files, self.chart, self)
+        finally:
+            inputs, self._inputs = self._inputs, None
+        self.memo.chart_results[key] = (tuple(yaml_files), [(entry, self._input_value(*entry)) for entry in inputs], result)
+        return result
+
+    def lines_by_extension(self):
+        """
+        Nombre de lignes des fichiers .yaml/.yml/.tpl de la chart, par
+        extension. Les fichiers illisibles sont signalés puis ignorés.
+        """
+        if self._lines_by_extension is None:
+            totals = {}
+            for entry in self.manifest:
+                if entry.role is None:
+                    continue
+                try:
+                    lines = self.line_count(entry.path)
+                except Exception as e:
+                    print(f"Erreur lors de la lecture du fichier {entry.path} : {e}")
+                    continue
+                totals[entry.extension] = totals.get(entry.extension, 0) + lines
+            self._lines_by_extension = totals
+        return self._lines_by_extension
+
+    def total_lines(self):
+        """Nombre total de lignes des fichiers .yaml/.yml/.tpl de la chart."""
+        return sum(self.lines_by_extension().values())
@@ -0,0 +1,137 @@
+"""
+Registre des checks de `scripts/`.
+
+Chaque check déclare ses métadonnées en tête de module :
+  - NAME    : nom de la mauvaise pratique (celui des rapports CSV) ;
+  - SCOPE   : "file" ou "chart" ;
+  - FILES   : classes de fichiers de la chart qu'il reçoit (voir
+              chart_context) : "chart_yaml", "values", "template",
+              "helper", "crd" et "other" ; tous les fichiers YAML
+              (YAML_ROLES) s'il n'en déclare pas ;
+  - VERSION : à incrémenter quand ses résultats changent.
+
+Ces métadonnées sont lues sans importer les modules (analyse de la syntaxe)
+et gardées dans un manifeste (`.smell_cache/checks_manifest.json`), mis à
+jour uniquement pour les fichiers modifiés depuis. Un check n'est importé
+que s'il est sélectionné.
+"""
+import os
+import ast
+import json
+import importlib.util
+
+from smell_cache import CACHE_FOLDER
+
+SCRIPTS_FOLDER = "scripts"
+MANIFEST_FILE = "checks_manifest.json"
+METADATA_FIELDS = ("NAME", "SCOPE", "FILES", "VERSION")
+
+_loaded = {} # chemin du module -> fonction check, un import par processus
+
+
+class CheckInfo:
+    def __init__(self, module, path, name, scope, files, version):
+        self.module = module
+        self.path = path
+        self.name = name
+        self.scope = scope
+        self.files = tuple(files)
+        self.version = version
+
+    def load(self):
+        """Importe le module du check (une seule fois) et retourne sa fonction `check`."""
+        check = _loaded.get(self.path)
+        if check is None:
+            spec = importlib.util.spec_from_file_location(self.module, self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            check = module.check
+            _loaded[self.path] = check
+        return check
+
+
+def read_metadata(path):
+    """Métadonnées d'un module de check, ou None s'il ne définit pas `check`."""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    metadata = {}
+    has_check = False
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "check":
+            has_check = True
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in METADATA_FIELDS:
+                    metadata[target.id] = ast.literal_eval(node.value)
+    if not has_check:
+        return None
+
+    module = os.path.basename(path)[:-3]
+    return {
+        "name": metadata.get("NAME", module),
+        "scope": metadata.get("SCOPE", "chart"),
+        "files": list(metadata.get("FILES", ())),
+        "version": str(metadata.get("VERSION", "0")),
+    }
+
+
+def discover(scripts_folder=SCRIPTS_FOLDER, manifest_path=None):
+    """
+    Liste les checks de `scripts_folder`, dans l'ordre de os.listdir (celui
+    dans lequel ils ont toujours été lancés), sans les importer.
+    """
+    if manifest_path is None:
+        manifest_path = os.path.join(CACHE_FOLDER, MANIFEST_FILE)
+
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    checks = []
+    updated = {}
+    for filename in os.listdir(scripts_folder):
+        if not filename.endswith(".py") or filename == "__init__.py":
+            continue
+
+        path = os.path.join(scripts_folder, filename)
+        stat = os.stat(path)
+        entry = manifest.get(path)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "metadata": read_metadata(path)}
+        updated[path] = entry
+
+        if entry["metadata"] is not None:
+            checks.append(CheckInfo(filename[:-3], path, **entry["metadata"]))
+
+    if updated != manifest:
+        # écriture atomique : plusieurs processus peuvent reconstruire le manifeste en même temps
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(updated, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    return checks
+
+
+def select(checks, names=None):
+    """
+    Garde les checks dont le NAME ou le nom de module est dans `names`
+    (tous si `names` est vide ou None).
+    """
+    if not names:
+        return checks
+
+    known = {check.name for check in checks} | {check.module for check in checks}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Checks inconnus : {', '.join(unknown)} (disponibles : {', '.join(sorted(check.name for check in checks))})")
+    return [check for check in checks if check.name in names or check.module in names]
+
+
+def parse_names(value):
+    """Liste de noms de checks de l'option --checks ("a,b,c")."""
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
@@ -1,29 +1,23 @@
 import os
-import importlib.util
-import csv
+import io
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from chart_context import ChartContext, DiskSource, YAML_ROLES, YAML_EXTENSIONS
+from smell_cache import SmellCache
+from check_registry import discover, select, parse_names
+from report_writer import ReportWriter
+from results_store import ResultsStore
+from profiler import Profiler, unmeasured, write_report, print_summary, print_cprofile, PROFILE_JSON, PROFILE_CSV
 
-SCRIPTS_FOLDER = "scripts"
 CHARTS_FOLDER = "charts"
 
-def load_check_functions():
-    check_functions = []
-
-    for filename in os.listdir(SCRIPTS_FOLDER):
-        if not filename.endswith(".py") or filename == "__init__.py":
-            continue
-
-        module_name = filename[:-3]
-        module_path = os.path.join(SCRIPTS_FOLDER, filename)
-
-        spec = importlib.util.spec_from_file_location(module_name, module_path)
-        module = importlib.util.module_from_spec(spec)
-
-        spec.loader.exec_module(module)
-
-        if hasattr(module, "check"):
-            check_functions.append(module.check)
-
-    return check_functions
+def load_check_functions(names=None):
+    """
+    Fonctions `check` des checks de scripts/ : tous, ou seulement ceux dont
+    le nom est dans `names`. Seuls les checks sélectionnés sont importés.
+    """
+    return [check.load() for check in select(discover(), names)]
 
 
 def get_charts_list():
@@ -39,48 +33,52 @@ def get_yaml_files(chart_path):
     Retourne tous les fichiers .yaml ou .yml d'une chart Helm,
     en ignorant les templates Go (.tpl).
     """
-    yaml_files = []
-
-    for root, dirs, files in os.walk(chart_path):
-        for file in files:
-            if file.endswith((".yaml", ".yml")):  # Only YAML
-                yaml_files.append(os.path.join(root, file))
-
-    return yaml_files
-
-def computeLinesOfChart(chart_path):
-    total_lines = 0
+    return [path for path, size, mtime in DiskSource().scan(chart_path) if path.endswith(YAML_EXTENSIONS)]
 
-    print("path for lines computation:", chart_path)
-    print("from :" + os.getcwd())
+def computeLinesOfChart(chart_path, context=None):
+    """
+    Nombre total de lignes des fichiers .yaml/.yml/.tpl de la chart, compté
+    sur les octets sans découper le texte (le détail par extension est donné
+    par context.lines_by_extension()).
+    """
+    if context is None:
+        context = ChartContext(chart_path) # un seul parcours de la chart, partagé avec les checks
+    return context.total_lines()
 
-    for root, dirs, files in os.walk(chart_path):
-        for file in files:
-            if file.endswith((".yaml", ".yml", ".tpl")):  # Only Useful Files
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        total_lines += len(lines)
-                except Exception as e:
-                    print(f"Erreur lors de la lecture du fichier {file_path} : {e}")
+def check_name(check):
+    return check.__globals__.get("NAME", check.__module__)
 
-    return total_lines
+def run_check(check, chart, context):
+    """
+    Lance un check sur les seuls fichiers des classes qu'il déclare dans
+    FILES (tous les fichiers YAML par défaut), pris dans l'index de la chart.
+    """
+    files = context.files_for(check.__globals__.get("FILES", YAML_ROLES))
+    if check.__globals__.get("SCOPE") == "chart":
+        return context.run_chart_check(check, files)
+    return check(files, chart, context)
 
-def process_single_chart_detailed(chart, checks):
+def process_single_chart_detailed(chart, checks, cache=None, context=None):
     code_smells = 0
     by_practice = {}
 
-    lines = computeLinesOfChart(chart)
-    yaml_files = get_yaml_files(chart)
+    if context is None:
+        context = ChartContext(chart, cache)
+    yaml_files = context.yaml_files
     files = len(yaml_files)
 
     for check in checks:
-        result = check(yaml_files, chart)
+        result = run_check(check, chart, context)
         count = result["code_smells"]
         by_practice[result["name"]] = count
         code_smells += count
 
+    # après les checks : les fichiers qu'ils ont lus sont comptés depuis la mémoire, les autres lus par morceaux
+    lines = computeLinesOfChart(chart, context)
+
+    if cache is not None:
+        cache.commit()
+
     return {
         "total": code_smells,
         "lines": lines,
@@ -89,96 +87,217 @@ def process_single_chart_detailed(chart, checks):
     }
 
 
-def process_single_chart(chart, checks=None):
-    if checks is None:
-        print("Checks were not provided, loading them...")
-        checks = load_check_functions()
+def scan_chart(chart, checks, cache=None, context=None, profiler=None):
+    """
+    Analyse une chart avec tous les checks en affichant le résultat de chacun.
+    Utilisée telle quelle en série et dans les workers du mode --jobs.
+    `context` permet de fournir une chart déjà chargée (par exemple lue
+    depuis les objets git d'un commit, voir git_snapshot). Avec un Profiler,
+    chaque étape de l'analyse est mesurée (voir profiler.py).
+    """
     print(f"Chart : {chart}")
+    measure = profiler.measure if profiler is not None else unmeasured
     codeSmells = 0
-    lines = computeLinesOfChart(chart)    
-    yaml_files = get_yaml_files(chart)
+    by_practice = {}
+    if context is None:
+        context = measure(chart, "ChartContext", None, lambda: ChartContext(chart, cache)) # chaque fichier de la chart n'est lu qu'une fois
+    yaml_files = context.yaml_files
     files = len(yaml_files)
 
     for check in checks:
-        result = check(yaml_files, chart)
+        result = measure(chart, check_name(check), context, lambda: run_check(check, chart, context))
         status = "✔️ OK" if result["success"] else "❌ FAIL"
         codeSmells += result["code_smells"]
+        by_practice[result["name"]] = result["code_smells"]
         print(f"  - {result['name']}: {status} ({result['details']})")
+
+    # après les checks : les fichiers qu'ils ont lus sont comptés depuis la mémoire, les autres lus par morceaux
+    lines = measure(chart, "computeLinesOfChart", context, lambda: computeLinesOfChart(chart, context))
+    lines_by_extension = ", ".join(f"{extension} : {count}" for extension, count in context.lines_by_extension().items())
     print("")
     print("total code smells for chart", chart, ":", codeSmells)
+    print("total lines for chart", chart, ":", lines, f"({lines_by_extension})" if lines_by_extension else "")
     print("")
 
-    return codeSmells, lines, files
+    if cache is not None:
+        cache.commit()
 
-def main():
+    return {
+        "total": codeSmells,
+        "lines": lines,
+        "files": files,
+        "by_practice": by_practice
+    }
+
+
+def process_single_chart(chart, checks=None, cache=None, context=None):
+    if checks is None:
+        print("Checks were not provided, loading them...")
+        checks = load_check_functions()
+    result = scan_chart(chart, checks, cache, context)
+
+    return result["total"], result["lines"], result["files"]
+
+
+# Checks (cache et profilage) chargés une seule fois par worker du mode --jobs
+_worker_checks = None
+_worker_cache = None
+_worker_profiler = None
+
+def _init_worker(cache_path, check_names, profile=False):
+    global _worker_checks, _worker_cache, _worker_profiler
+    _worker_checks = load_check_functions(check_names)
+    if cache_path is not None:
+        _worker_cache = SmellCache(cache_path)
+    if profile:
+        _worker_profiler = Profiler()
+
+def _scan_chart_in_worker(chart):
+    # la sortie est capturée puis réaffichée dans l'ordre des charts par le processus principal
+    output = io.StringIO()
+    hits, misses = (_worker_cache.hits, _worker_cache.misses) if _worker_cache else (0, 0)
+    with contextlib.redirect_stdout(output):
+        result = scan_chart(chart, _worker_checks, _worker_cache, profiler=_worker_profiler)
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    records = _worker_profiler.take_records() if _worker_profiler is not None else []
+    return result, output.getvalue(), hits, misses, records
+
+def scan_charts(charts, checks, jobs=1, cache=None, check_names=None, profiler=None):
+    """
+    Génère (chart, résultat) dans l'ordre de `charts`, que l'analyse soit
+    faite en série ou répartie sur `jobs` processus (qui chargent les checks
+    `check_names`, les mêmes que `checks`). Les mesures des workers sont
+    ajoutées à celles de `profiler`.
+    """
+    if jobs <= 1:
+        for chart in charts:
+            yield chart, scan_chart(chart, checks, cache, profiler=profiler)
+        return
+
+    cache_path = cache.path if cache is not None else None
+    initargs = (cache_path, check_names, profiler is not None)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        for chart, (result, output, hits, misses, records) in zip(charts, executor.map(_scan_chart_in_worker, charts)):
+            print(output, end="")
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+            if profiler is not None:
+                profiler.records += records
+            yield chart, result
+
+def main(jobs=1, use_cache=True, check_names=None, resume=False, profile=False, profile_check=None, profile_top=10):
     print("Chargement des checks...")
-    checks = load_check_functions()
+    checks = load_check_functions(check_names)
     print(f"{len(checks)} checks chargés.")
 
+    profiler = None
+    if profile or profile_check:
+        # le check passé sous cProfile est désigné par son NAME ou par son module
+        profiler = Profiler(select(discover(), [profile_check])[0].name if profile_check else None)
+
+    cache = SmellCache() if use_cache else None
+
     charts = get_charts_list()
     print(f"{len(charts)} charts trouvées.")
 
+    # chaque chart est écrite dans les CSV et dans la table typée dès qu'elle est analysée
+    store = ResultsStore()
+    writer = ReportWriter(resume=resume, store=store)
+    remaining = [chart for chart in charts if chart.split("/")[1] not in writer.done] # remove the "charts/" prefix
+    if resume:
+        print(f"Reprise : {len(charts) - len(remaining)} charts déjà présentes dans {writer.report_path}.")
+    if jobs > 1:
+        print(f"Analyse répartie sur {jobs} processus.")
+
     print("\n--- Résultats ---\n")
-    codeSmellsPerChart = {}
-    codeSmellsByPractice = {}
+    try:
+        for chart, result in scan_charts(remaining, checks, jobs, cache, check_names, profiler):
+            writer.write(chart.split("/")[1], result)
+    finally:
+        writer.close()
+        store.close()
 
-    linesPerChart = {}
-    filesPerChart = {}
-    for chart in charts:
-        print(f"Chart : {chart}")
-        codeSmellsPerChart[chart] = 0
-        linesPerChart[chart] = computeLinesOfChart(chart)    
-        yaml_files = get_yaml_files(chart)
-        filesPerChart[chart] = len(yaml_files)
-        for check in checks:
-            result = check(yaml_files, chart)
-            status = "✔️ OK" if result["success"] else "❌ FAIL"
-            codeSmellsPerChart[chart] += result["code_smells"]
-            practice = result["name"]
-            if chart not in codeSmellsByPractice:
-                codeSmellsByPractice[chart] = {}
-
-            codeSmellsByPractice[chart][practice] = result["code_smells"]
-            print(f"  - {result['name']}: {status} ({result['details']})")
-        print("")
-        print("total code smells for chart", chart, ":", codeSmellsPerChart[chart])
-        print("")
+    if cache is not None:
+        print(f"Cache : {cache.hits} résultats réutilisés, {cache.misses} calculés ({cache.path})")
+        cache.close()
 
     print("--- Résumé des code smells par chart ---")
-    for chart, code_smells in codeSmellsPerChart.items():
-        print(f"Chart: {chart} → Code Smells: {code_smells}, Total Lines: {linesPerChart[chart]}, Total Files: {filesPerChart[chart]}, ratio: {code_smells/linesPerChart[chart] if linesPerChart[chart]>0 else 0}")
-
-    with open("code_smells_report.csv", "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Chart", "Code Smells", "Total Lines", "Total Files", "Ratio"])
-        for chart, code_smells in codeSmellsPerChart.items():
-            ratio = code_smells / linesPerChart[chart] if linesPerChart[chart] > 0 else 0
-            chart_name_without_charts_prefix = chart.split("/")[1] # remove the "charts/" prefix
-            writer.writerow([chart_name_without_charts_prefix, code_smells, linesPerChart[chart], filesPerChart[chart], ratio])
-
-    with open("code_smells_by_practice.csv", "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow([
-            "Chart",
-            "Practice",
-            "Code Smells",
-            "Total Lines",
-            "Ratio"
-        ])
-
-        for chart, practices in codeSmellsByPractice.items():
-            total_lines = linesPerChart.get(chart, 0)
-            chart_name = chart.split("/")[1]
-
-            for practice, count in practices.items():
-                ratio = count / total_lines if total_lines > 0 else 0
-                writer.writerow([
-                    chart_name,
-                    practice,
-                    count,
-                    total_lines,
-                    ratio
-                ])
+    for chart in charts:
+        code_smells, lines, files = writer.done[chart.split("/")[1]]
+        print(f"Chart: {chart} → Code Smells: {code_smells}, Total Lines: {lines}, Total Files: {files}, ratio: {code_smells/lines if lines>0 else 0}")
+
+    if profiler is not None:
+        write_report(profiler.records)
+        print_summary(profiler.records, profile_top)
+        print(f"\nMesures détaillées écrites dans {PROFILE_JSON} et {PROFILE_CSV}")
+        if profiler.cprofile is not None:
+            print_cprofile(profiler, f"profile_{profiler.profiled_check}.prof")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Calcule les code smells de chaque chart du dossier 'charts'.")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="nombre de processus utilisés pour analyser les charts en parallèle (défaut : 1, en série)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ré-analyse tous les fichiers sans lire ni remplir le cache .smell_cache/"
+    )
+    parser.add_argument(
+        "--checks",
+        help="liste de checks à lancer, séparés par des virgules (NAME ou nom du module dans scripts/, défaut : tous)"
+    )
+    parser.add_argument(
+        "--list-checks",
+        action="store_true",
+        help="affiche les checks disponibles et leurs métadonnées, sans rien analyser"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="reprend une exécution interrompue : les charts déjà présentes dans code_smells_report.csv ne sont pas ré-analysées"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="mesure le temps, le temps CPU, les octets lus et le pic de mémoire de chaque (chart, check) "
+             f"et les écrit dans {PROFILE_JSON} et {PROFILE_CSV} (à combiner avec --no-cache)"
+    )
+    parser.add_argument(
+        "--profile-check",
+        help="check (NAME ou nom du module) exécuté en plus sous cProfile, en série uniquement ; implique --profile"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="nombre de checks, de charts et de mesures affichés dans le résumé du profil (défaut : 10)"
+    )
+    args = parser.parse_args()
+    if args.profile_check and args.jobs > 1:
+        parser.error("--profile-check ne fonctionne qu'en série (--jobs 1)")
+    try:
+        # noms de checks inconnus signalés comme une erreur d'option, avant toute analyse
+        select(discover(), parse_names(args.checks))
+        if args.profile_check:
+            select(discover(), [args.profile_check])
+    except ValueError as e:
+        parser.error(str(e))
+    if args.list_checks:
+        for check in discover():
+            print(f"{check.name} ({check.module}) : scope={check.scope}, fichiers={', '.join(check.files)}, version={check.version}")
+    else:
+        main(
+            args.jobs,
+            use_cache=not args.no_cache,
+            check_names=parse_names(args.checks),
+            resume=args.resume,
+            profile=args.profile,
+            profile_check=args.profile_check,
+            profile_top=args.profile_top,
+        )
@@ -1,163 +1,8 @@
-import os
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-
-# -------------------------
-# Setup
-# -------------------------
-OUTPUT_DIR = "graphs_ratio_per_file"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# -------------------------
-# Load & clean data
-# -------------------------
-df = pd.read_csv("final_report.csv")
-
-# Clean days_ago (handle quoted values with comma decimal)
-def parse_days_ago(x):
-    if isinstance(x, str):
-        x = x.replace(",", ".").replace('"', "")
-    return float(x)
-
-df["days_ago"] = df["days_ago"].apply(parse_days_ago)
-
-# -------------------------
-# Recompute ratio based on files
-# -------------------------
-df["ratio"] = df["code_smells"] / df["total_files"]
-
-# -------------------------
-# Helper function
-# -------------------------
-def plot_scatter(x, y, data, label, filename, xlabel, ylabel):
-    plt.figure(figsize=(10, 6))  # width, height in inches
-    for name, group in data:
-        plt.scatter(group[x], group[y], label=name, alpha=0.6)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, filename))
-    plt.close()
-
-# -------------------------
-# 1. Bad practices vs stars (commu vs entreprise)
-# -------------------------
-plot_scatter(
-    x="stars",
-    y="ratio",
-    data=df.assign(
-    origin=df["origin"].replace({
-        "commu": "Créé par la communauté",
-        "entreprise": "Créé par une entreprise"
-    })
-    ).groupby("origin"),
-    label="origin",
-    filename="bad_practices_vs_stars_origin.png",
-    xlabel="Nombre d'étoiles Artifactory",
-    ylabel="Nombre de mauvaises pratiques par fichier"
-)
-
-# -------------------------
-# 2. Bad practices vs stars with median split
-# -------------------------
-median_stars = df["stars"].median()
-
-df["stars_group"] = np.where(
-    df["stars"] <= median_stars,
-    "En-dessous de la médiane du nombre d'étoiles",
-    "Au-dessus de la médiane du nombre d'étoiles"
-)
-
-plt.figure(figsize=(10, 6))  # width, height in inches
-for (origin, group_name), group in df.groupby(["origin", "stars_group"]):
-    label = f"{origin} - {group_name}"
-    plt.scatter(group["stars"], group["ratio"], label=label, alpha=0.6)
-
-plt.xlabel("Nombre d'étoiles Artifactory")
-plt.ylabel("Nombre de mauvaises pratiques par fichier")
-plt.legend()
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "bad_practices_vs_stars_median_split.png"))
-plt.close()
-
-# -------------------------
-# 3. Bad practices vs total files
-# -------------------------
-plot_scatter(
-    x="total_files",
-    y="ratio",
-    data=df.assign(
-    origin=df["origin"].replace({
-        "commu": "Créé par la communauté",
-        "entreprise": "Créé par une entreprise"
-    })
-    ).groupby("origin"),
-    label="origin",
-    filename="bad_practices_vs_total_files.png",
-    xlabel="Nombre total de fichiers de configuration",
-    ylabel="Nombre de mauvaises pratiques par fichier"
-)
-
-# -------------------------
-# 4. Bad practices vs days ago
-# -------------------------
-plt.figure(figsize=(10, 6))  # width, height in inches
-plt.scatter(df["days_ago"], df["ratio"], alpha=0.6)
-plt.xlabel("Derniere release (days ago)")
-plt.ylabel("Nombre de mauvaises pratiques par fichier")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "bad_practices_vs_days_ago.png"))
-plt.close()
-
-# -------------------------
-# 5. Quartiles of days_ago (bar chart)
-# -------------------------
-
-quartiles, bins = pd.qcut(
-    df["days_ago"],
-    q=4,
-    retbins=True,
-    duplicates="drop"
-)
-
-labels = [
-    f"Q{i+1} ({int(bins[i])} → {int(bins[i+1])} jours)"
-    for i in range(len(bins) - 1)
-]
-
-df["days_quartile"] = pd.qcut(
-    df["days_ago"],
-    q=4,
-    labels=labels,
-    duplicates="drop"
-)
-
-quartile_means = df.groupby("days_quartile")["ratio"].mean()
-
-plt.figure(figsize=(10, 6))  # width, height in inches
-quartile_means.plot(kind="bar")
-plt.ylabel("Nombre moyen de mauvaises pratiques par fichier")
-plt.xlabel("Quartiles de jours depuis la dernière release")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "bad_practices_by_days_ago_quartiles.png"))
-plt.close()
-
-# -------------------------
-# 6. Mean comparison commu vs entreprise
-# -------------------------
-mean_ratios = df.groupby("origin")["ratio"].mean()
-
-plt.figure(figsize=(10, 6))  # width, height in inches
-mean_ratios.plot(kind="bar")
-plt.ylabel("Nombre moyen de mauvaises pratiques par fichier")
-plt.xlabel("Origine du chart")
-plt.title(
-    "Nombre moyen de mauvaises pratiques par fichier : Communauté vs Entreprise"
-)
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "mean_bad_practices_commu_vs_entreprise.png"))
-plt.close()
-
-print("Tous les graphiques ont été générés dans le dossier 'graphs/'")
+"""
+Graphes de la variante "per_file" (graphs_ratio_per_file/), gardé pour les appels existants :
+les trois variantes sont générées en une fois par `python graphs.py`.
+"""
+from graphs import main
+
+if __name__ == "__main__":
+    main(["per_file"])
@@ -1,64 +1,32 @@
 import tomli
-import os
-import sys
 from pathlib import Path
-from code_smells_calculator import process_single_chart, load_check_functions
-import matplotlib.pyplot as plt
-from find_repo_tags import find_tags
-
-checks = load_check_functions()
+from figures import new_figure, save, render
+from history_metrics import HistoryMetrics, MEAN_EVOLUTION
 
 def keep_only_last_part(full_tag: list[str]) -> list[str]:
     """Garde seulement la partie après le dernier '/' dans un tag complet pour chaque tag"""
     return [tag.split("/")[-1] for tag in full_tag]
 
-def compute_smells_for_repo(repository_folder: str, chart_folder_path: str, tag_to_checkout: tuple[str, str]):
-    print(
-        f"Processing repo='{repository_folder}', "
-        f"chart='{chart_folder_path}', "
-        f"tag='{tag_to_checkout}'"
-    )
-    print("Current directory: ", Path.cwd())
-    current_dir = Path.cwd()
-
-
-    # chdir to repository folder
-    repo_path = Path(repository_folder)
-    # chdir
-    os.chdir(repo_path)
-    # checkout tag
-    os.system(f"git checkout {tag_to_checkout[0]}")
-    os.chdir(current_dir)
-
-    chart_path = repo_path / chart_folder_path
-    if not chart_path.exists():
-        print(f"Chart path '{chart_path}' does not exist, from {Path.cwd()}. Skipping.")
-        return
-    
-    # process charts
-    codeSmells, lines, files = process_single_chart(str(chart_path), checks)
-
-    os.chdir(current_dir)
-
-    print(
-        f"Results for repo='{repository_folder}', "
-        f"chart='{chart_folder_path}', "
-        f"tag='{tag_to_checkout}': "
-        f"Date='{tag_to_checkout[1]}', "
-        f"code_smells={codeSmells}, "
-        f"lines={lines}, "
-        f"files={files}"
-    )
-    return codeSmells, lines, files
-
-
-def main(toml_path: Path):
+def plot_evolution(results: dict, title: str, filename: str):
+    figure, ax = new_figure((10, 6))
+    ax.plot(keep_only_last_part(list(results.keys())), list(results.values()), marker='o')
+    ax.set_title(title)
+    ax.set_xlabel("Git Tags")
+    ax.set_ylabel("Ratio of evolution between first and last tag")
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.autoscale("y")
+    ax.grid(True)
+    save(figure, filename)
+
+def main(toml_path: Path, store: HistoryMetrics = None, jobs=None):
     with toml_path.open("rb") as f:
         config = tomli.load(f)
 
     repositories = config.get("repositories", [])
 
-    current_dir = Path.cwd()
+    # the commits were scanned once by history_replay.py, this script only reads the metrics
+    if store is None:
+        store = HistoryMetrics()
 
     global_smells_results = {}
     global_lines_results = {}
@@ -69,28 +37,22 @@ def main(toml_path: Path):
         repository_folder = repo["repository_folder"]
         chart_folder_path = repo["chart_folder_path"]
 
-        tags_to_checkout = find_tags(1, repository_folder)
+        replayed = store.series(MEAN_EVOLUTION, repository_folder, chart_folder_path)
+        tags_to_checkout = [tag for tag, _ in replayed]
 
         print("tags to checkout: ", tags_to_checkout)
 
         # store results per tag
         results_per_tag = {}
 
-        for tag in tags_to_checkout:
-            smells_result = compute_smells_for_repo(repository_folder, chart_folder_path, tag)
-
-            if not smells_result:
+        for tag, result in replayed:
+            if not result:
                 continue
-            codeSmells, lines, files = smells_result
-
-            print("Returning to directory: ", current_dir)
-
-            os.chdir(current_dir) # go back to original dir after processing each repo/tag
 
             results_per_tag[tag[0]] = {
-                "code_smells": codeSmells,
-                "lines": lines,
-                "files": files
+                "code_smells": result["total"],
+                "lines": result["lines"],
+                "files": result["files"]
             }
 
         print(f"Summary for repository '{repository_folder}', chart '{chart_folder_path}':")
@@ -128,48 +90,18 @@ def main(toml_path: Path):
         last_ratio_result = last_smell_result / last_lines_result if last_lines_result > 0 else 0
         global_ratio_results[str(repository_folder) + str(chart_folder_path)] = (last_ratio_result - first_ratio_result) / first_ratio_result if first_ratio_result > 0 else 0
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(keep_only_last_part(list(global_smells_results.keys())), global_smells_results.values(), marker='o')
-    plt.title(f"Code Smells (not ratio, pure number) evolution over Tags")
-    plt.xlabel("Git Tags")
-    plt.ylabel("Ratio of evolution between first and last tag")
-    plt.xticks(rotation=90)
-    plt.autoscale("y")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(f"code_smells_over_time.png")
-    plt.close()
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(keep_only_last_part(list(global_lines_results.keys())), global_lines_results.values(), marker='o')
-    plt.title(f"Lines over Tags")
-    plt.xlabel("Git Tags")
-    plt.ylabel("Ratio of evolution between first and last tag")
-    plt.xticks(rotation=90)
-    plt.autoscale("y")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(f"lines_over_time.png")
-    plt.close()
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(keep_only_last_part(list(global_ratio_results.keys())), global_ratio_results.values(), marker='o')
-    plt.title(f"Code Smells per Lines over Tags")
-    plt.xlabel("Git Tags")
-    plt.ylabel("Ratio of evolution between first and last tag")
-    plt.xticks(rotation=90)
-    plt.autoscale("y")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(f"code_smells_per_lines_over_time.png")
-    plt.close()
+    render([
+        (plot_evolution, (global_smells_results, "Code Smells (not ratio, pure number) evolution over Tags", "code_smells_over_time.png")),
+        (plot_evolution, (global_lines_results, "Lines over Tags", "lines_over_time.png")),
+        (plot_evolution, (global_ratio_results, "Code Smells per Lines over Tags", "code_smells_per_lines_over_time.png")),
+    ], jobs)
 
     # write this data in a CSV
     with open("global_results.csv", "w") as f:
         f.write("repository_chart,code_smells_evolution,lines_evolution,code_smells_per_lines_evolution\n")
         for key in global_smells_results.keys():
             f.write(f"{key},{global_smells_results[key]},{global_lines_results[key]},{global_ratio_results[key]}\n")
-    
+
 
 if __name__ == "__main__":
     main(Path("graph-over-time.toml"))
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Couche de rendu commune des scripts de graphes.
+
+Les figures sont construites avec l'API objet de matplotlib (Figure et Axes,
+sans l'état global de pyplot) et enregistrées avec le backend Agg, sans
+affichage. Chaque figure est décrite par une fonction de dessin et ses
+arguments ; `render` dessine les figures indépendantes en parallèle sur un
+pool de processus (les PNG produits sont les mêmes qu'en série).
+
+    tasks = [(plot_practice, (dates, values, title, path)) for ...]
+    render(tasks, jobs=8)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+
+
+def new_figure(figsize):
+    """Figure (hors pyplot) et ses axes."""
+    figure = Figure(figsize=figsize)
+    return figure, figure.subplots()
+
+
+def save(figure, path):
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def render(tasks, jobs=None):
+    """
+    Appelle chaque `fonction(*arguments)` de `tasks`, en parallèle sur `jobs`
+    processus (par défaut un par CPU). Les fonctions et leurs arguments
+    doivent donc être définis au niveau d'un module et sérialisables.
+    """
+    tasks = list(tasks)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(tasks) <= 1:
+        for function, arguments in tasks:
+            function(*arguments)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        futures = [executor.submit(function, *arguments) for function, arguments in tasks]
+        for future in futures:
+            future.result()  # relève l'erreur éventuelle d'une figure
@@ -1,6 +1,7 @@
 import subprocess
-import os
-from datetime import datetime
+from bisect import bisect_left
+from itertools import accumulate
+from datetime import datetime, timezone
 from dateutil.relativedelta import relativedelta
 
 def git(cmd, fault_on_error=True):
@@ -15,29 +16,49 @@ def git(cmd, fault_on_error=True):
         raise RuntimeError(f"Git command {' '.join(cmd)} failed with error: {result.stderr}")
     return result.stdout
 
-def find_tags(months_range: int, repo_path: str):
-    current_dir = os.getcwd()
-    os.chdir(repo_path)
+def parse_log(output):
+    """(sha, timestamp) for each '%H %ct' line of git log."""
+    commits = []
+    for line in output.splitlines():
+        sha, timestamp = line.split()
+        commits.append((sha, int(timestamp)))
+    return commits
 
-    git(["git", "checkout", "master"], fault_on_error=False) # make sure to have access to one of the tags
-    git(["git", "checkout", "main"], fault_on_error=False) #one of these commands will fail, it is not a problem as the other one will have worked
-
-    log = git([
-        "git", "log", "--reverse",
-        "--format=%H %ad", "--date=iso"
-    ]).splitlines()
+def sample_commits(commits, months_range: int):
+    """
+    Keep the first commit, then the first commit dated at least `months_range`
+    months after the previously kept one.
+    Each boundary is found by bisection over the running maximum of the
+    timestamps (git log order is not strictly chronological), which selects
+    exactly the same commits as scanning the whole log.
+    """
+    running_max = list(accumulate((timestamp for _, timestamp in commits), max))
 
     selected = []
-    last_date = None
+    index = 0
+    while index < len(commits):
+        sha, timestamp = commits[index]
+        commit_date = datetime.fromtimestamp(timestamp, timezone.utc)
+        selected.append((sha, commit_date.date()))
+
+        boundary = (commit_date + relativedelta(months=months_range)).timestamp()
+        index = bisect_left(running_max, boundary, index + 1)
+    return selected
+
+def find_tags(months_range: int, repo_path: str, chart_folder_path: str = None):
+    # every git command targets the repository with -C, the process cwd is never changed
+    # log of the main branch, read without checking it out (the working tree is never touched)
+    branch = next(
+        (b for b in ("main", "master") if git(["git", "-C", repo_path, "rev-parse", "--verify", "--quiet", b], fault_on_error=False).strip()),
+        "HEAD"
+    )
 
-    for line in log:
-        sha, date_str = line.split(maxsplit=1)
-        commit_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S %z")
+    # only the commits that touched the chart, with their committer date as a unix timestamp
+    cmd = ["git", "-C", repo_path, "log", "--reverse", "--format=%H %ct", branch]
+    if chart_folder_path is not None:
+        cmd += ["--", chart_folder_path]
 
-        if last_date is None or commit_date >= last_date + relativedelta(months=months_range):
-            selected.append((sha, commit_date.date()))
-            last_date = commit_date
+    selected = sample_commits(parse_log(git(cmd)), months_range)
 
-    os.chdir(current_dir)
     print("selected tags: ", selected)
-    return selected # List of tuples (sha, date)
\ No newline at end of file
+    return selected # List of tuples (sha, date)
@@ -1,87 +1,54 @@
 import tomli
-import os
-import sys
 from pathlib import Path
-from code_smells_calculator import process_single_chart, load_check_functions
-import matplotlib.pyplot as plt
-from find_repo_tags import find_tags
-
-checks = load_check_functions()
-
-def compute_smells_for_repo(repository_folder: str, chart_folder_path: str, tag_to_checkout: tuple[str, str]):
-    print(
-        f"Processing repo='{repository_folder}', "
-        f"chart='{chart_folder_path}', "
-        f"tag='{tag_to_checkout}'"
-    )
-    print("Current directory: ", Path.cwd())
-    current_dir = Path.cwd()
-
-
-    # chdir to repository folder
-    repo_path = Path(repository_folder)
-    # chdir
-    os.chdir(repo_path)
-    # checkout tag
-    os.system(f"git checkout {tag_to_checkout[0]}")
-    os.chdir(current_dir)
-
-    chart_path = repo_path / chart_folder_path
-    if not chart_path.exists():
-        print(f"Chart path '{chart_path}' does not exist, from {Path.cwd()}. Skipping.")
-        return
-    
-    # process charts
-    codeSmells, lines, files = process_single_chart(str(chart_path), checks)
-
-    os.chdir(current_dir)
-
-    print(
-        f"Results for repo='{repository_folder}', "
-        f"chart='{chart_folder_path}', "
-        f"tag='{tag_to_checkout}': "
-        f"Date='{tag_to_checkout[1]}', "
-        f"code_smells={codeSmells}, "
-        f"lines={lines}, "
-        f"files={files}"
-    )
-    return codeSmells, lines, files
-
-
-def main(toml_path: Path):
+from figures import new_figure, save, render
+from history_metrics import HistoryMetrics, GRAPHS_OVER_TIME
+
+
+def plot_over_tags(dates, values, title, ylabel, filename, color=None):
+    figure, ax = new_figure((10, 6))
+    ax.plot(dates, values, marker='o', color=color)
+    ax.set_title(title)
+    ax.set_xlabel("Git Tags")
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.autoscale("y")
+    ax.grid(True)
+    save(figure, filename)
+
+
+def main(toml_path: Path, store: HistoryMetrics = None, jobs=None):
     with toml_path.open("rb") as f:
         config = tomli.load(f)
 
     repositories = config.get("repositories", [])
 
-    current_dir = Path.cwd()
+    # the commits were scanned once by history_replay.py, this script only reads the metrics
+    if store is None:
+        store = HistoryMetrics()
 
+    # figures of every repository, rendered in parallel once all series are read
+    tasks = []
+    saved = []
     for repo in repositories:
         repository_folder = repo["repository_folder"]
         chart_folder_path = repo["chart_folder_path"]
 
-        tags_to_checkout = find_tags(6, repository_folder)
+        replayed = store.series(GRAPHS_OVER_TIME, repository_folder, chart_folder_path)
+        tags_to_checkout = [tag for tag, _ in replayed]
 
         print("tags to checkout: ", tags_to_checkout)
 
         # store results per tag
         results_per_tag = {}
 
-        for tag in tags_to_checkout:
-            smells_result = compute_smells_for_repo(repository_folder, chart_folder_path, tag)
-
-            if not smells_result:
+        for tag, result in replayed:
+            if not result:
                 continue
-            codeSmells, lines, files = smells_result
-
-            print("Returning to directory: ", current_dir)
-
-            os.chdir(current_dir) # go back to original dir after processing each repo/tag
 
             results_per_tag[tag[0]] = {
-                "code_smells": codeSmells,
-                "lines": lines,
-                "files": files
+                "code_smells": result["total"],
+                "lines": result["lines"],
+                "files": result["files"]
             }
 
         print(f"Summary for repository '{repository_folder}', chart '{chart_folder_path}':")
@@ -109,18 +76,15 @@ def main(toml_path: Path):
             for tag in tags_to_checkout
         ]
 
-        plt.figure(figsize=(10, 6))
-        plt.plot([tag[1] for tag in tags_to_checkout], code_smells_per_k_lines, marker='o')
-        plt.title(f"Code Smells per line over Tags\nRepository: {repository_folder}, Chart: {chart_folder_path}")
-        plt.xlabel("Git Tags")
-        plt.ylabel("Code Smells per line")
-        plt.xticks(rotation=45)
-        plt.autoscale("y")
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig(f"{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_over_time.png")
-        plt.close()
-        print(f"Plot saved as '{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_over_time.png'")
+        filename = f"{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_over_time.png"
+        tasks.append((plot_over_tags, (
+            [tag[1] for tag in tags_to_checkout],
+            code_smells_per_k_lines,
+            f"Code Smells per line over Tags\nRepository: {repository_folder}, Chart: {chart_folder_path}",
+            "Code Smells per line",
+            filename,
+        )))
+        saved.append(filename)
 
         # plot
         # horizontal axis: tags
@@ -131,19 +95,20 @@ def main(toml_path: Path):
             if results_per_tag[tag[0]]["files"] > 0 else 0
             for tag in tags_to_checkout
         ]
-        plt.figure(figsize=(10, 6))
-        plt.plot([tag[1] for tag in tags_to_checkout], code_smells_per_files, marker='o', color='orange')
-        plt.title(f"Code Smells per file over Tags\nRepository: {repository_folder}, Chart: {chart_folder_path}")
-        plt.xlabel("Git Tags")
-        plt.ylabel("Code Smells per file")
-        plt.xticks(rotation=45)
-        plt.autoscale("y")
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig(f"{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_per_files_over_time.png")
-        plt.close()
-        print(f"Plot saved as '{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_per_files_over_time.png'")
-
+        filename = f"{repository_folder.replace('/', '_')}_{chart_folder_path.replace('/', '_')}_code_smells_per_files_over_time.png"
+        tasks.append((plot_over_tags, (
+            [tag[1] for tag in tags_to_checkout],
+            code_smells_per_files,
+            f"Code Smells per file over Tags\nRepository: {repository_folder}, Chart: {chart_folder_path}",
+            "Code Smells per file",
+            filename,
+            'orange',
+        )))
+        saved.append(filename)
+
+    render(tasks, jobs)
+    for filename in saved:
+        print(f"Plot saved as '{filename}'")
 
 
 if __name__ == "__main__":
@@ -1,39 +1,28 @@
 import tomli
-import os
 from pathlib import Path
-import matplotlib.pyplot as plt
-from code_smells_calculator import process_single_chart_detailed, load_check_functions
-from find_repo_tags_for_practice import find_tags
+from figures import new_figure, save, render
+from history_metrics import HistoryMetrics, PRACTICE_EVOLUTION
 
 
 REPO_BASE = Path("target-repo").resolve()
 
 
-checks = load_check_functions()
-
-
 def get_output_dir(repo_name: str, chart_name: str) -> Path:
     out = Path("graphs_practices_over_time") / repo_name / chart_name
     out.mkdir(parents=True, exist_ok=True)
     return out
 
 
-def analyze_repo(repo_path: str, chart_path: str, months_range: int = 6):
-    repo_path = Path(repo_path).resolve()
-    chart_path = repo_path / chart_path
-
-    tags = find_tags(months_range, str(repo_path))
+def analyze_repo(repo_path: str, chart_path: str, store: HistoryMetrics = None):
+    # les commits ont été analysés une seule fois par history_replay.py, on relit leurs métriques
+    if store is None:
+        store = HistoryMetrics()
 
     results = []
-
-    for sha, date in tags:
-        os.system(f"git -C {repo_path} checkout {sha}")
-
-        if not chart_path.exists():
+    for (sha, date), res in store.series(PRACTICE_EVOLUTION, str(repo_path), chart_path):
+        if res is None:
             continue
 
-        res = process_single_chart_detailed(str(chart_path), checks)
-
         results.append({
             "sha": sha,
             "date": date,
@@ -64,38 +53,43 @@ def build_time_series(results):
     return dates, series
 
 
-def plot_per_practice(dates, series, output_dir, repo_name, chart_name):
-    for practice, values in series.items():
-        plt.figure(figsize=(8, 5))
-        plt.plot(dates, values, marker="o")
-        plt.title(f"{practice}\n{repo_name} / {chart_name}")
-        plt.xlabel("Date")
-        plt.ylabel("Nombre de mauvaises pratiques par ligne")
-        plt.xticks(rotation=45)
-        plt.grid(True)
-        plt.tight_layout()
+def plot_practice(dates, values, output_dir, repo_name, chart_name, practice):
+    figure, ax = new_figure((8, 5))
+    ax.plot(dates, values, marker="o")
+    ax.set_title(f"{practice}\n{repo_name} / {chart_name}")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Nombre de mauvaises pratiques par ligne")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.grid(True)
 
-        fname = f"{repo_name}_{chart_name}_{practice}.png".replace("/", "_")
-        plt.savefig(output_dir / fname)
-        plt.close()
+    fname = f"{repo_name}_{chart_name}_{practice}.png".replace("/", "_")
+    save(figure, output_dir / fname)
 
 
 def plot_stacked(dates, series, output_dir, repo_name, chart_name):
     labels = list(series.keys())
     values = [series[p] for p in labels]
 
-    plt.figure(figsize=(12, 7))
-    plt.stackplot(dates, values, labels=labels)
-    plt.title(f"Évolution des mauvaises pratiques\n{repo_name} / {chart_name}")
-    plt.xlabel("Date")
-    plt.ylabel("Nombre de mauvaises pratiques par ligne")
-    plt.legend(loc="upper left", bbox_to_anchor=(1.02, 1))
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    figure, ax = new_figure((12, 7))
+    ax.stackplot(dates, values, labels=labels)
+    ax.set_title(f"Évolution des mauvaises pratiques\n{repo_name} / {chart_name}")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Nombre de mauvaises pratiques par ligne")
+    ax.legend(loc="upper left", bbox_to_anchor=(1.02, 1))
+    ax.tick_params(axis="x", labelrotation=45)
 
     fname = f"{repo_name}_{chart_name}_STACKED.png".replace("/", "_")
-    plt.savefig(output_dir / fname)
-    plt.close()
+    save(figure, output_dir / fname)
+
+
+def plot_per_practice(dates, series, output_dir, repo_name, chart_name, jobs=None):
+    """Une figure par pratique et la figure empilée, dessinées en parallèle sur `jobs` processus."""
+    tasks = [
+        (plot_practice, (dates, values, output_dir, repo_name, chart_name, practice))
+        for practice, values in series.items()
+    ]
+    tasks.append((plot_stacked, (dates, series, output_dir, repo_name, chart_name)))
+    render(tasks, jobs)
 
 
 def save_practice_stats(dates, series, output_dir):
@@ -138,9 +132,8 @@ def main(toml_path: Path):
 
     repo_path = REPO_BASE
     chart_path = repo_cfg["chart_folder_path"]
-    months_range = repo_cfg["months_range"]
 
-    results = analyze_repo(repo_path, chart_path, months_range)
+    results = analyze_repo(repo_path, chart_path)
     dates, series = build_time_series(results)
 
     repo_name = repo_path.name
@@ -149,7 +142,6 @@ def main(toml_path: Path):
     output_dir = get_output_dir(repo_name, chart_name)
 
     plot_per_practice(dates, series, output_dir, repo_name, chart_name)
-    plot_stacked(dates, series, output_dir, repo_name, chart_name)
     save_practice_stats(dates, series, output_dir)
 
 
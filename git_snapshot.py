@@ -0,0 +1,258 @@
+"""
+Lecture d'une chart à un commit donné directement depuis les objets git,
+sans `git checkout` : la liste des fichiers vient de `git ls-tree -r` et leur
+contenu d'un unique processus `git cat-file --batch` gardé ouvert pour tout
+le dépôt. Le répertoire de travail des dépôts n'est jamais modifié.
+
+Lors d'un parcours de l'historique, seule la première lecture d'une chart
+liste tout son dossier : pour les commits suivants, la liste est mise à jour
+à partir de `git diff-tree` avec le commit lu précédemment.
+
+Comme après un `git checkout`, un lien symbolique vers un fichier est lu
+comme ce fichier : sa cible est résolue dans l'arbre du commit (`git
+cat-file --follow-symlinks`). Un lien cassé, qui boucle ou qui sort du
+dépôt reste listé mais sa lecture échoue ; un lien vers un dossier n'est
+pas parcouru, comme avec os.walk.
+"""
+import os
+import errno
+import subprocess
+from pathlib import Path
+
+from chart_context import ChartContext, ChartFile
+from smell_cache import BlobMemo
+
+
+class GitRepository:
+    """
+    Accès en lecture seule aux objets d'un dépôt git. Les résultats des checks
+    sont mémorisés par blob (`memo`) pour tous les commits lus via ce dépôt.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = str(repo_path)
+        self.memo = BlobMemo()
+        self._cat_file = None
+        self._trees = {} # dossier de chart -> (sha, {chemin: (objet, lien symbolique ?)}) du dernier commit lu
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def list_tree(self, sha, folder):
+        """
+        Retourne les fichiers (chemin relatif à la racine du dépôt, objet,
+        lien symbolique ?) présents sous `folder` au commit `sha` ; l'objet
+        d'un lien symbolique est celui de son chemin cible, pas encore résolu.
+        """
+        result = subprocess.run(
+            ["git", "-C", self.repo_path, "ls-tree", "-r", "-z", sha, "--", folder],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git ls-tree {sha} {folder} failed with error: {result.stderr.decode(errors='replace')}")
+
+        entries = []
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            meta, path = record.split(b"\t", 1)
+            mode, kind, obj = meta.split(b" ")
+            if kind != b"blob":
+                continue  # sous-modules ignorés
+            entries.append((os.fsdecode(path), obj.decode(), mode == b"120000"))
+        return entries
+
+    def diff_tree(self, old_sha, sha, folder):
+        """
+        Fichiers de `folder` modifiés entre `old_sha` et `sha` : liste de
+        (chemin, nouvel objet, lien symbolique ?), l'objet valant None pour
+        un fichier supprimé.
+        """
+        result = subprocess.run(
+            ["git", "-C", self.repo_path, "diff-tree", "-r", "-z", "--no-renames", old_sha, sha, "--", folder],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git diff-tree {old_sha} {sha} {folder} failed with error: {result.stderr.decode(errors='replace')}")
+
+        changes = []
+        records = result.stdout.split(b"\0")
+        for meta, path in zip(records[0::2], records[1::2]):
+            old_mode, new_mode, old_obj, new_obj, status = meta[1:].split(b" ")
+            if status == b"D" or new_mode == b"160000":
+                changes.append((os.fsdecode(path), None, False)) # supprimé, ou devenu sous-module
+            else:
+                changes.append((os.fsdecode(path), new_obj.decode(), new_mode == b"120000"))
+        return changes
+
+    def resolve_links(self, sha, paths):
+        """
+        Blob de la cible de chaque lien symbolique `paths` au commit `sha`,
+        en suivant les liens dans l'arbre du commit : "tree" pour un lien
+        vers un dossier, None pour un lien cassé, qui boucle ou qui sort du
+        dépôt.
+        """
+        if not paths:
+            return {}
+        result = subprocess.run(
+            ["git", "-C", self.repo_path, "cat-file", "--batch-check", "--follow-symlinks"],
+            input=b"".join(f"{sha}:{path}\n".encode() for path in paths),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git cat-file --follow-symlinks {sha} failed with error: {result.stderr.decode(errors='replace')}")
+
+        targets = {}
+        lines = iter(result.stdout.split(b"\n"))
+        for path in paths:
+            fields = next(lines).split(b" ")
+            if fields[0] in (b"dangling", b"loop", b"notdir", b"symlink"):
+                next(lines)  # chemin de la cible non résolue
+                targets[path] = None
+            elif fields[-1] == b"missing":
+                targets[path] = None
+            elif fields[1] == b"tree":
+                targets[path] = "tree"
+            else:
+                targets[path] = fields[0].decode()
+        return targets
+
+    def tree_entries(self, sha, chart_folder_path):
+        """
+        Fichiers (chemin, blob) de la chart au commit `sha`, obtenus à partir
+        du dernier commit lu pour cette chart et des seuls fichiers modifiés
+        depuis. Les liens symboliques sont résolus à chaque commit, leur
+        cible ayant pu changer sans eux ; le blob d'un lien illisible vaut None.
+        """
+        previous = self._trees.get(chart_folder_path)
+        if previous is None:
+            entries = {path: (obj, link) for path, obj, link in self.list_tree(sha, chart_folder_path)}
+        else:
+            previous_sha, entries = previous
+            entries = dict(entries)
+            for path, obj, link in self.diff_tree(previous_sha, sha, chart_folder_path):
+                if obj is None:
+                    entries.pop(path, None)
+                else:
+                    entries[path] = (obj, link)
+        self._trees[chart_folder_path] = (sha, entries)
+
+        targets = self.resolve_links(sha, [path for path, (_, link) in entries.items() if link])
+        files = []
+        for path, (obj, link) in entries.items():
+            blob = targets[path] if link else obj
+            if blob != "tree": # lien vers un dossier : pas parcouru, comme avec os.walk
+                files.append((path, blob))
+
+        # ordre de `git ls-tree -r` : chemins complets triés octet par octet
+        return sorted(files, key=lambda entry: os.fsencode(entry[0]))
+
+    def read_blob(self, blob):
+        """Contenu brut d'un blob, lu via le processus `git cat-file --batch`."""
+        if self._cat_file is None:
+            self._cat_file = subprocess.Popen(
+                ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+
+        self._cat_file.stdin.write(blob.encode() + b"\n")
+        self._cat_file.stdin.flush()
+
+        header = self._cat_file.stdout.readline().split()
+        if len(header) != 3:
+            raise FileNotFoundError(errno.ENOENT, f"Objet git introuvable dans {self.repo_path}", blob)
+
+        data = self._cat_file.stdout.read(int(header[2]))
+        self._cat_file.stdout.read(1)  # saut de ligne qui suit chaque objet
+        return data
+
+    def chart_context(self, sha, chart_folder_path, cache=None):
+        """
+        Construit le ChartContext de la chart `chart_folder_path` au commit
+        `sha`, ou None si la chart n'existe pas à ce commit. Les chemins vus
+        par les checks sont les mêmes que pour une chart extraite sur le disque.
+        """
+        entries = self.tree_entries(sha, chart_folder_path)
+        if not entries:
+            return None
+
+        chart_path = str(Path(self.repo_path) / chart_folder_path)
+        return ChartContext(chart_path, cache, GitTreeSource(self, entries), self.memo)
+
+    def close(self):
+        if self._cat_file is not None:
+            self._cat_file.stdin.close()
+            self._cat_file.wait()
+            self._cat_file = None
+
+
+class GitTreeSource:
+    """
+    Arborescence en mémoire des fichiers d'un commit, parcourue comme os.walk
+    (fichiers d'un dossier d'abord, puis ses sous-dossiers, dans l'ordre git).
+    Le contenu des fichiers n'est lu qu'à la première demande.
+    """
+
+    def __init__(self, repository, entries):
+        self.repository = repository
+        self.blobs = {}
+        self.dirs = {}
+
+        for rel_path, blob in entries:
+            path = os.path.normpath(os.path.join(repository.repo_path, rel_path))
+            self.blobs[path] = blob
+            parent, name = os.path.split(path)
+            self._directory(parent)[1].append(name)
+
+    def _directory(self, path):
+        node = self.dirs.get(path)
+        if node is None:
+            node = ([], [])
+            self.dirs[path] = node
+            parent, name = os.path.split(path)
+            if name and parent != path:
+                self._directory(parent)[0].append(name)
+        return node
+
+    def scan(self, top):
+        """(chemin, taille, mtime) des fichiers sous `top` ; taille et date ne sont pas connues sans lire les blobs."""
+        return [
+            (os.path.join(root, file), None, None)
+            for root, dirs, files in self.walk(top)
+            for file in files
+        ]
+
+    def walk(self, top):
+        node = self.dirs.get(os.path.normpath(top))
+        if node is None:
+            return
+        subdirs, files = node
+        yield top, list(subdirs), list(files)
+        for subdir in subdirs:
+            yield from self.walk(os.path.join(top, subdir))
+
+    def exists(self, path):
+        path = os.path.normpath(path)
+        return path in self.blobs or path in self.dirs
+
+    def blob(self, path):
+        """Identifiant du blob de `path`, sans lire son contenu (None si absent)."""
+        return self.blobs.get(os.path.normpath(path))
+
+    def listing(self, top):
+        """Chemins de tous les fichiers sous `top` : change seulement si un fichier est ajouté ou supprimé."""
+        prefix = os.path.join(os.path.normpath(top), "")
+        return tuple(path for path in self.blobs if path.startswith(prefix))
+
+    def open(self, path):
+        blob = self.blobs.get(os.path.normpath(path))
+        if blob is None:
+            return ChartFile(path, error=FileNotFoundError(errno.ENOENT, "No such file or directory", path))
+        return ChartFile(path, blob=blob, loader=lambda: self.repository.read_blob(blob))
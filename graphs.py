@@ -0,0 +1,257 @@
+"""
+Graphes de l'étude à partir des résultats joints (vue `final_report` de
+`code_smells_results.sqlite`, voir aggregate_csv.py).
+
+Les données sont chargées une seule fois, puis les trois variantes des
+graphes sont calculées à partir du même tableau et dessinées dans le même
+processus, en parallèle (voir figures.py) :
+  - raw            (graphs/)                     : ratio par ligne ;
+  - peaks_excluded (graphs_with_peaks_excluded/) : ratio par ligne, valeurs
+    au-delà du 95e percentile exclues ;
+  - per_file       (graphs_ratio_per_file/)      : ratio par fichier.
+
+    python graphs.py                    # les trois variantes
+    python graphs.py --variants raw,per_file
+"""
+import os
+import argparse
+from typing import NamedTuple
+
+import pandas as pd
+import numpy as np
+
+from figures import new_figure, save, render
+from results_store import ResultsStore
+
+ORIGIN_LABELS = {
+    "commu": "Créé par la communauté",
+    "entreprise": "Créé par une entreprise"
+}
+
+
+class Variant(NamedTuple):
+    output_dir: str
+    per: str                    # "ligne" ou "fichier", dans les libellés des axes
+    size_column: str            # taille de la chart en abscisse du graphe 3
+    size_label: str
+    filtered: bool              # exclusion des valeurs au-delà du 95e percentile
+    stars_groups: tuple         # libellés (sous la médiane, au-dessus de la médiane)
+    message: str
+
+
+VARIANTS = {
+    "raw": Variant(
+        "graphs", "ligne", "total_lines", "lignes", False,
+        ("En-dessous de la médiane du nombre d'étoiles", "Au-dessus de la médiane du nombre d'étoiles"),
+        "Tous les graphiques ont été générés",
+    ),
+    "peaks_excluded": Variant(
+        "graphs_with_peaks_excluded", "ligne", "total_lines", "lignes", True,
+        ("Sous médiane", "Au-dessus médiane"),
+        "Tous les graphiques filtrés au 95e percentile ont été générés",
+    ),
+    "per_file": Variant(
+        "graphs_ratio_per_file", "fichier", "total_files", "fichiers", False,
+        ("En-dessous de la médiane du nombre d'étoiles", "Au-dessus de la médiane du nombre d'étoiles"),
+        "Tous les graphiques ont été générés",
+    ),
+}
+
+
+def load_report():
+    """Vue final_report, lue une fois pour toutes les variantes."""
+    store = ResultsStore()
+    df = pd.read_sql_query("SELECT * FROM final_report", store.connection)
+    store.close()
+    return df
+
+
+def variant_data(df, name):
+    """Tableau d'une variante : le ratio est recalculé par ligne ou par fichier."""
+    denominator = df["total_files"] if VARIANTS[name].per == "fichier" else df["total_lines"]
+    return df.assign(ratio=df["code_smells"] / denominator)
+
+
+def filter_top95(df, x_col, y_col):
+    """Exclut les valeurs dont x ou y dépasse le 95e percentile"""
+    x_thresh = df[x_col].quantile(0.95)
+    y_thresh = df[y_col].quantile(0.95)
+    return df[(df[x_col] <= x_thresh) & (df[y_col] <= y_thresh)]
+
+
+def ylabel(variant, mean=False):
+    return f"Nombre {'moyen ' if mean else ''}de mauvaises pratiques par {variant.per}"
+
+
+def plot_scatter(variant, x, y, data, filename, xlabel):
+    figure, ax = new_figure((10, 6))  # width, height in inches
+    for name, group in data:
+        if variant.filtered:
+            group = filter_top95(group, x, y)
+        ax.scatter(group[x], group[y], label=name, alpha=0.6)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel(variant))
+    ax.legend()
+    save(figure, os.path.join(variant.output_dir, filename))
+
+
+def by_origin(df):
+    return df.assign(origin=df["origin"].replace(ORIGIN_LABELS)).groupby("origin")
+
+
+# -------------------------
+# 1. Bad practices vs stars (commu vs entreprise)
+# -------------------------
+def plot_stars_origin(df, variant):
+    plot_scatter(
+        variant,
+        x="stars",
+        y="ratio",
+        data=by_origin(df),
+        filename="bad_practices_vs_stars_origin.png",
+        xlabel="Nombre d'étoiles Artifactory"
+    )
+
+
+# -------------------------
+# 2. Bad practices vs stars with median split
+# -------------------------
+def plot_stars_median_split(df, variant):
+    median_stars = df["stars"].median()
+    below, above = variant.stars_groups
+    split = df.assign(stars_group=np.where(df["stars"] <= median_stars, below, above))
+
+    figure, ax = new_figure((10, 6))  # width, height in inches
+    for (origin, group_name), group in split.groupby(["origin", "stars_group"]):
+        if variant.filtered:
+            group = filter_top95(group, "stars", "ratio")
+        label = f"{origin} - {group_name}"
+        ax.scatter(group["stars"], group["ratio"], label=label, alpha=0.6)
+
+    ax.set_xlabel("Nombre d'étoiles Artifactory")
+    ax.set_ylabel(ylabel(variant))
+    ax.legend()
+    save(figure, os.path.join(variant.output_dir, "bad_practices_vs_stars_median_split.png"))
+
+
+# -------------------------
+# 3. Bad practices vs total lines (ou total files)
+# -------------------------
+def plot_size(df, variant):
+    plot_scatter(
+        variant,
+        x=variant.size_column,
+        y="ratio",
+        data=by_origin(df),
+        filename=f"bad_practices_vs_{variant.size_column}.png",
+        xlabel=f"Nombre total de {variant.size_label} de configuration"
+    )
+
+
+# -------------------------
+# 4. Bad practices vs days ago
+# -------------------------
+def plot_days_ago(df, variant):
+    recent = filter_top95(df, "days_ago", "ratio") if variant.filtered else df
+
+    figure, ax = new_figure((10, 6))  # width, height in inches
+    ax.scatter(recent["days_ago"], recent["ratio"], alpha=0.6)
+    ax.set_xlabel("Derniere release (days ago)")
+    ax.set_ylabel(ylabel(variant))
+    save(figure, os.path.join(variant.output_dir, "bad_practices_vs_days_ago.png"))
+
+
+# -------------------------
+# 5. Quartiles of days_ago (bar chart)
+# -------------------------
+def plot_days_ago_quartiles(df, variant):
+    recent = filter_top95(df, "days_ago", "ratio") if variant.filtered else df
+
+    quartiles, bins = pd.qcut(
+        recent["days_ago"],
+        q=4,
+        retbins=True,
+        duplicates="drop"
+    )
+
+    labels = [
+        f"Q{i+1} ({int(bins[i])} → {int(bins[i+1])} jours)"
+        for i in range(len(bins) - 1)
+    ]
+
+    days_quartile = pd.qcut(
+        recent["days_ago"],
+        q=4,
+        labels=labels,
+        duplicates="drop"
+    )
+
+    quartile_means = recent.assign(days_quartile=days_quartile).groupby("days_quartile")["ratio"].mean()
+
+    figure, ax = new_figure((10, 6))  # width, height in inches
+    quartile_means.plot(kind="bar", ax=ax)
+    ax.set_ylabel(ylabel(variant, mean=True))
+    ax.set_xlabel("Quartiles de jours depuis la dernière release")
+    save(figure, os.path.join(variant.output_dir, "bad_practices_by_days_ago_quartiles.png"))
+
+
+# -------------------------
+# 6. Mean comparison commu vs entreprise
+# -------------------------
+def plot_mean_by_origin(df, variant):
+    focused = filter_top95(df, "ratio", "ratio") if variant.filtered else df  # Se focaliser sur ratio
+    mean_ratios = focused.groupby("origin")["ratio"].mean()
+
+    figure, ax = new_figure((10, 6))  # width, height in inches
+    mean_ratios.plot(kind="bar", ax=ax)
+    ax.set_ylabel(ylabel(variant, mean=True))
+    ax.set_xlabel("Origine du chart")
+    ax.set_title(
+        f"Nombre moyen de mauvaises pratiques par {variant.per} : Communauté vs Entreprise"
+    )
+    save(figure, os.path.join(variant.output_dir, "mean_bad_practices_commu_vs_entreprise.png"))
+
+
+FIGURES = [
+    plot_stars_origin,
+    plot_stars_median_split,
+    plot_size,
+    plot_days_ago,
+    plot_days_ago_quartiles,
+    plot_mean_by_origin,
+]
+
+
+def main(variant_names=None, jobs=None):
+    """Dessine les six figures de chaque variante, réparties sur `jobs` processus."""
+    df = load_report()
+    tasks = []
+    for name in variant_names or VARIANTS:
+        variant = VARIANTS[name]
+        os.makedirs(variant.output_dir, exist_ok=True)
+        data = variant_data(df, name)
+        tasks += [(plot, (data, variant)) for plot in FIGURES]
+    render(tasks, jobs)
+
+    for name in variant_names or VARIANTS:
+        print(f"{VARIANTS[name].message} dans le dossier '{VARIANTS[name].output_dir}/'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère les graphes de l'étude à partir des résultats joints.")
+    parser.add_argument(
+        "--variants",
+        help=f"variantes à générer, séparées par des virgules ({', '.join(VARIANTS)} ; défaut : toutes)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        help="nombre de processus dessinant les figures en parallèle (défaut : un par CPU)"
+    )
+    args = parser.parse_args()
+    names = [name.strip() for name in args.variants.split(",") if name.strip()] if args.variants else None
+    unknown = [name for name in names or () if name not in VARIANTS]
+    if unknown:
+        parser.error(f"variantes inconnues : {', '.join(unknown)}")
+    main(names, args.jobs)
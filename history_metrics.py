@@ -0,0 +1,163 @@
+"""
+Table persistante des métriques des charts au fil de l'historique.
+
+`history_replay.py` est la seule étape qui lit les dépôts git et lance les
+checks : elle remplit, pour chaque (dépôt, chart, commit), le nombre de code
+smells, de lignes, de fichiers YAML et le détail par pratique, ainsi que la
+liste ordonnée des commits échantillonnés par chaque rapport. Les scripts
+generate_graphs_over_time.py, compute_mean_evolution.py et
+generate_practice_evolution.py ne font ensuite que relire cette table.
+"""
+import json
+import sqlite3
+import hashlib
+from datetime import date
+
+from smell_cache import CACHE_FORMAT_VERSION
+from check_registry import discover, select
+
+HISTORY_FILE = "history_metrics.sqlite"
+
+# Rapports qui lisent la table, chacun avec son propre échantillonnage des commits
+GRAPHS_OVER_TIME = "graphs_over_time"
+MEAN_EVOLUTION = "mean_evolution"
+PRACTICE_EVOLUTION = "practice_evolution"
+
+
+# Code par lequel passe le calcul des métriques d'un commit : lecture des
+# objets git, mémoire des blobs et cache, contexte de chart, analyse
+REPLAY_SOURCES = [
+    "chart_context.py",
+    "line_rules.py",
+    "code_smells_calculator.py",
+    "git_snapshot.py",
+    "smell_cache.py",
+    "history_replay.py",
+]
+
+
+def checks_fingerprint(check_names=None):
+    """
+    Empreinte des checks sélectionnés et du code de calcul (REPLAY_SOURCES) :
+    les métriques calculées avec une autre version ou un autre ensemble de
+    checks ne sont pas réutilisées.
+    """
+    digest = hashlib.sha1(CACHE_FORMAT_VERSION.encode())
+    sources = sorted(check.path for check in select(discover(), check_names))
+    sources += REPLAY_SOURCES
+    for source_path in sources:
+        with open(source_path, "rb") as f:
+            digest.update(source_path.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+class HistoryMetrics:
+    def __init__(self, path=HISTORY_FILE, fingerprint=None):
+        self.path = path
+        self.fingerprint = fingerprint if fingerprint is not None else checks_fingerprint()
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS metrics (
+                repository_folder TEXT NOT NULL,
+                chart_folder_path TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                checks_version TEXT NOT NULL,
+                present INTEGER NOT NULL,
+                code_smells INTEGER,
+                lines INTEGER,
+                files INTEGER,
+                by_practice TEXT,
+                PRIMARY KEY (repository_folder, chart_folder_path, sha, checks_version)
+            );
+            CREATE TABLE IF NOT EXISTS samples (
+                report TEXT NOT NULL,
+                repository_folder TEXT NOT NULL,
+                chart_folder_path TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                sha TEXT NOT NULL,
+                date TEXT NOT NULL,
+                PRIMARY KEY (report, repository_folder, chart_folder_path, position)
+            );
+            """
+        )
+        self.connection.commit()
+
+    def known_shas(self, repository_folder, chart_folder_path):
+        """Commits déjà analysés avec la version courante des checks."""
+        rows = self.connection.execute(
+            "SELECT sha FROM metrics WHERE repository_folder = ? AND chart_folder_path = ? AND checks_version = ?",
+            (repository_folder, chart_folder_path, self.fingerprint),
+        )
+        return {row[0] for row in rows}
+
+    def put_metrics(self, repository_folder, chart_folder_path, sha, result):
+        """`result` est le résultat de scan_chart, ou None si la chart n'existe pas à ce commit."""
+        if result is None:
+            values = (0, None, None, None, None)
+        else:
+            values = (1, result["total"], result["lines"], result["files"], json.dumps(result["by_practice"]))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (repository_folder, chart_folder_path, sha, self.fingerprint) + values,
+        )
+
+    def put_samples(self, report, repository_folder, chart_folder_path, tags):
+        """Remplace la liste ordonnée des commits (sha, date) échantillonnés par `report`."""
+        self.connection.execute(
+            "DELETE FROM samples WHERE report = ? AND repository_folder = ? AND chart_folder_path = ?",
+            (report, repository_folder, chart_folder_path),
+        )
+        self.connection.executemany(
+            "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (report, repository_folder, chart_folder_path, position, sha, str(commit_date))
+                for position, (sha, commit_date) in enumerate(tags)
+            ],
+        )
+
+    def series(self, report, repository_folder, chart_folder_path):
+        """
+        Commits échantillonnés par `report`, dans l'ordre : liste de
+        ((sha, date), résultat ou None), le résultat ayant la même forme que
+        celui de scan_chart.
+        """
+        rows = self.connection.execute(
+            """
+            SELECT s.sha, s.date, m.present, m.code_smells, m.lines, m.files, m.by_practice
+            FROM samples s
+            LEFT JOIN metrics m
+                ON m.repository_folder = s.repository_folder
+                AND m.chart_folder_path = s.chart_folder_path
+                AND m.sha = s.sha
+                AND m.checks_version = ?
+            WHERE s.report = ? AND s.repository_folder = ? AND s.chart_folder_path = ?
+            ORDER BY s.position
+            """,
+            (self.fingerprint, report, repository_folder, chart_folder_path),
+        ).fetchall()
+        if not rows or any(row[2] is None for row in rows):
+            raise LookupError(
+                f"Pas de métriques à jour pour '{repository_folder}' ({chart_folder_path}), rapport '{report}' : "
+                "lancez d'abord `python history_replay.py`."
+            )
+
+        series = []
+        for sha, commit_date, present, code_smells, lines, files, by_practice in rows:
+            result = None
+            if present:
+                result = {
+                    "total": code_smells,
+                    "lines": lines,
+                    "files": files,
+                    "by_practice": json.loads(by_practice),
+                }
+            series.append(((sha, date.fromisoformat(commit_date)), result))
+        return series
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,273 @@
+"""
+Étape unique de parcours de l'historique des charts : lit les dépôts de
+graph-over-time.toml et graph-analyze-practice.toml, analyse chaque commit
+échantillonné et enregistre les métriques dans history_metrics.sqlite (voir
+history_metrics), que generate_graphs_over_time.py, compute_mean_evolution.py
+et generate_practice_evolution.py se contentent ensuite de relire.
+
+Les commits sont lus depuis les objets git (voir git_snapshot), sans
+`git checkout` ni `os.chdir` : plusieurs dépôts, et plusieurs groupes de
+commits d'un même dépôt, peuvent donc être analysés en même temps par un
+pool de processus. Les résultats sont toujours rendus dans l'ordre des
+commits échantillonnés, quel que soit l'ordre de fin des workers. Un commit
+échantillonné par plusieurs rapports n'est analysé qu'une fois, et les
+commits déjà présents dans la table (avec la même version des checks) ne
+sont pas ré-analysés.
+"""
+import io
+import os
+import argparse
+import contextlib
+import tomli
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from code_smells_calculator import scan_chart, load_check_functions
+from find_repo_tags import find_tags
+from find_repo_tags_for_practice import find_tags as find_practice_tags
+from git_snapshot import GitRepository
+from smell_cache import SmellCache, BlobMemo, DEFAULT_CACHE_PATH
+from check_registry import discover, select, parse_names
+from history_metrics import HistoryMetrics, checks_fingerprint, GRAPHS_OVER_TIME, MEAN_EVOLUTION, PRACTICE_EVOLUTION
+from generate_practice_evolution import REPO_BASE
+
+# Intervalle (en mois) entre deux commits échantillonnés, par rapport
+GRAPHS_OVER_TIME_MONTHS = 6
+MEAN_EVOLUTION_MONTHS = 1
+
+# Nombre de commits consécutifs d'un même dépôt confiés à un worker : des
+# groupes plus grands profitent mieux de la mémoire des blobs, des groupes
+# plus petits répartissent mieux un gros dépôt entre les workers.
+DEFAULT_COMMITS_PER_TASK = 8
+
+
+def scan_commit(repository, chart_folder_path, tag, checks, cache=None):
+    """
+    Analyse la chart `chart_folder_path` au commit `tag` = (sha, date).
+    Retourne le résultat détaillé de scan_chart, ou None si la chart
+    n'existe pas à ce commit.
+    """
+    sha, date = tag
+    print(
+        f"Processing repo='{repository.repo_path}', "
+        f"chart='{chart_folder_path}', "
+        f"tag='{tag}'"
+    )
+
+    chart_path = Path(repository.repo_path) / chart_folder_path
+    context = repository.chart_context(sha, chart_folder_path, cache)
+    if context is None:
+        print(f"Chart path '{chart_path}' does not exist at commit {sha}. Skipping.")
+        return None
+
+    result = scan_chart(str(chart_path), checks, cache, context)
+
+    print(
+        f"Results for repo='{repository.repo_path}', "
+        f"chart='{chart_folder_path}', "
+        f"tag='{tag}': "
+        f"Date='{date}', "
+        f"code_smells={result['total']}, "
+        f"lines={result['lines']}, "
+        f"files={result['files']}"
+    )
+    return result
+
+
+# État propre à chaque worker : checks, cache disque et un GitRepository
+# (donc un processus `git cat-file --batch` et une mémoire des blobs) par dépôt
+_worker_checks = None
+_worker_cache = None
+_worker_repositories = {}
+
+def _init_worker(cache_path, check_names):
+    global _worker_checks, _worker_cache
+    _worker_checks = load_check_functions(check_names)
+    if cache_path is not None:
+        _worker_cache = SmellCache(cache_path)
+
+def _scan_commits_in_worker(task):
+    repository_folder, chart_folder_path, tags = task
+    repository = _worker_repositories.get(repository_folder)
+    if repository is None:
+        repository = GitRepository(repository_folder)
+        _worker_repositories[repository_folder] = repository
+
+    hits, misses = repository.memo.hits, repository.memo.misses
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        results = [scan_commit(repository, chart_folder_path, tag, _worker_checks, _worker_cache) for tag in tags]
+    if _worker_cache is not None:
+        _worker_cache.commit()
+    return results, output.getvalue(), repository.memo.hits - hits, repository.memo.misses - misses
+
+
+def replay(tags_per_entry, jobs=1, commits_per_task=DEFAULT_COMMITS_PER_TASK, use_cache=True, check_names=None):
+    """
+    Analyse les commits `tags_per_entry[(repository_folder, chart_folder_path)]`,
+    liste ordonnée de (sha, date).
+
+    Retourne (results, dedup) :
+      - results[(repository_folder, chart_folder_path)] = liste ordonnée de
+        (tag, résultat ou None) ;
+      - dedup[(repository_folder, chart_folder_path)] = BlobMemo qui ne sert
+        qu'à compter les réutilisations de résultats par blob.
+    """
+    results = {key: [None] * len(tags) for key, tags in tags_per_entry.items()}
+    dedup = {key: BlobMemo() for key in tags_per_entry}
+    done = {key: 0 for key in tags_per_entry}
+
+    def report(key, index, chunk, chunk_results, hits, misses):
+        results[key][index:index + len(chunk)] = list(zip(chunk, chunk_results))
+        dedup[key].hits += hits
+        dedup[key].misses += misses
+        done[key] += len(chunk)
+        total = len(tags_per_entry[key])
+        finished = sum(1 for k in done if done[k] == len(tags_per_entry[k]))
+        print(f"[{finished}/{len(tags_per_entry)}] {key[0]} ({key[1]}) : {done[key]}/{total} commits")
+
+    tasks = []
+    for key, tags in tags_per_entry.items():
+        for index in range(0, len(tags), commits_per_task):
+            tasks.append((key, index, tags[index:index + commits_per_task]))
+
+    if jobs <= 1:
+        checks = load_check_functions(check_names)
+        cache = SmellCache() if use_cache else None
+        repositories_by_folder = {}
+        for key, index, chunk in tasks:
+            repository = repositories_by_folder.get(key[0])
+            if repository is None:
+                repository = GitRepository(key[0])
+                repositories_by_folder[key[0]] = repository
+            hits, misses = repository.memo.hits, repository.memo.misses
+            chunk_results = [scan_commit(repository, key[1], tag, checks, cache) for tag in chunk]
+            if cache is not None:
+                cache.commit()
+            report(key, index, chunk, chunk_results, repository.memo.hits - hits, repository.memo.misses - misses)
+        for repository in repositories_by_folder.values():
+            repository.close()
+        if cache is not None:
+            cache.close()
+        return results, dedup
+
+    cache_path = DEFAULT_CACHE_PATH if use_cache else None
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache_path, check_names)) as executor:
+        futures = {
+            executor.submit(_scan_commits_in_worker, (key[0], key[1], chunk)): (key, index, chunk)
+            for key, index, chunk in tasks
+        }
+        # la sortie capturée de chaque worker est réaffichée dans l'ordre des tâches
+        for future, (key, index, chunk) in futures.items():
+            chunk_results, output, hits, misses = future.result()
+            print(output, end="")
+            report(key, index, chunk, chunk_results, hits, misses)
+
+    return results, dedup
+
+
+def history_entries(over_time_toml=Path("graph-over-time.toml"), practice_toml=Path("graph-analyze-practice.toml")):
+    """
+    (rapport, repository_folder, chart_folder_path, months_range, sampler)
+    pour chaque série temporelle des trois scripts de rapport.
+    """
+    entries = []
+    if over_time_toml.exists():
+        with over_time_toml.open("rb") as f:
+            config = tomli.load(f)
+        for repo in config.get("repositories", []):
+            entries.append((GRAPHS_OVER_TIME, repo["repository_folder"], repo["chart_folder_path"], GRAPHS_OVER_TIME_MONTHS, find_tags))
+            entries.append((MEAN_EVOLUTION, repo["repository_folder"], repo["chart_folder_path"], MEAN_EVOLUTION_MONTHS, find_tags))
+
+    if practice_toml.exists():
+        with practice_toml.open("rb") as f:
+            repo_cfg = tomli.load(f)["repository"]
+        entries.append((PRACTICE_EVOLUTION, str(REPO_BASE), repo_cfg["chart_folder_path"], repo_cfg["months_range"], find_practice_tags))
+    return entries
+
+
+def compute_history(entries, store, jobs=1, commits_per_task=DEFAULT_COMMITS_PER_TASK, use_cache=True, check_names=None):
+    """
+    Échantillonne les commits de chaque entrée, analyse ceux qui ne sont pas
+    encore dans `store` (HistoryMetrics) et y enregistre métriques et
+    échantillons. Retourne la mémoire des blobs de chaque (dépôt, chart).
+    """
+    samples = []
+    pending = {}
+    for report, repository_folder, chart_folder_path, months_range, sampler in entries:
+        if not os.path.isdir(repository_folder):
+            print(f"Repository '{repository_folder}' not found, skipping report '{report}'.")
+            continue
+
+        tags = sampler(months_range, repository_folder, chart_folder_path)
+        samples.append((report, repository_folder, chart_folder_path, tags))
+
+        key = (repository_folder, chart_folder_path)
+        if key not in pending:
+            pending[key] = {"known": store.known_shas(repository_folder, chart_folder_path), "tags": {}}
+        for tag in tags:
+            if tag[0] not in pending[key]["known"]:
+                pending[key]["tags"].setdefault(tag[0], tag)
+
+    # commits des différents rapports fusionnés dans l'ordre chronologique,
+    # pour que chaque groupe confié à un worker reste fait de commits voisins
+    tags_per_entry = {
+        key: sorted(entry["tags"].values(), key=lambda tag: tag[1])
+        for key, entry in pending.items()
+        if entry["tags"]
+    }
+    for key, entry in pending.items():
+        print(f"{key[0]} ({key[1]}) : {len(tags_per_entry.get(key, []))} commits à analyser, {len(entry['known'])} déjà connus")
+
+    results, dedup = replay(tags_per_entry, jobs, commits_per_task, use_cache, check_names)
+
+    for (repository_folder, chart_folder_path), replayed in results.items():
+        for tag, result in replayed:
+            store.put_metrics(repository_folder, chart_folder_path, tag[0], result)
+    for report, repository_folder, chart_folder_path, tags in samples:
+        store.put_samples(report, repository_folder, chart_folder_path, tags)
+    store.commit()
+    return dedup
+
+
+def main(jobs=1, commits_per_task=DEFAULT_COMMITS_PER_TASK, use_cache=True, check_names=None):
+    # les métriques d'un sous-ensemble de checks sont rangées à part de celles de tous les checks
+    store = HistoryMetrics(fingerprint=checks_fingerprint(check_names))
+    dedup = compute_history(history_entries(), store, jobs, commits_per_task, use_cache, check_names)
+    store.close()
+    print(f"Métriques enregistrées dans {store.path}")
+
+    print("Blob dedup across commits, per repository:")
+    for (repository_folder, chart_folder_path), memo in dedup.items():
+        print(f"  {repository_folder} ({chart_folder_path}): {memo.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse une seule fois l'historique des dépôts utilisés par les rapports temporels.")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count(),
+        help="nombre de processus analysant les commits en parallèle, tous dépôts confondus (défaut : nombre de CPU)"
+    )
+    parser.add_argument(
+        "--commits-per-task",
+        type=int,
+        default=DEFAULT_COMMITS_PER_TASK,
+        help="nombre de commits consécutifs d'un même dépôt confiés à un processus"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ré-analyse tous les fichiers sans lire ni remplir le cache .smell_cache/"
+    )
+    parser.add_argument(
+        "--checks",
+        help="liste de checks à lancer, séparés par des virgules (défaut : tous)"
+    )
+    args = parser.parse_args()
+    try:
+        select(discover(), parse_names(args.checks)) # noms inconnus signalés avant tout parcours
+    except ValueError as e:
+        parser.error(str(e))
+    main(args.jobs, args.commits_per_task, use_cache=not args.no_cache, check_names=parse_names(args.checks))
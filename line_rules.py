@@ -0,0 +1,170 @@
+"""
+Moteur commun des règles "ligne par ligne" des checks de `scripts/`.
+
+Chaque règle déclare les chaînes littérales dont la présence sur une ligne
+est nécessaire pour qu'elle s'applique, et une fonction appelée sur ces
+lignes seulement. Le contenu de chaque fichier n'est parcouru qu'une fois
+pour toutes les règles : les occurrences de tous les littéraux enregistrés
+sont cherchées avec find (recherche en C, bien plus rapide qu'une
+alternative `re` qui essaie chaque branche à chaque position), puis seules
+les lignes candidates sont découpées et confiées aux règles qui y ont trouvé
+un de leurs littéraux. Ajouter une règle n'ajoute donc pas de nouveau
+passage ligne par ligne sur tous les fichiers des charts.
+
+La recherche se fait directement sur les octets du fichier (scan_bytes) :
+le fichier n'est ni décodé ni découpé en lignes, les numéros de ligne sont
+comptés sur les octets et seules les lignes candidates sont décodées. Le
+texte décodé (scan) n'est utilisé que pour les fichiers non ASCII ou
+contenant des \\r, où décodage et fins de ligne peuvent changer le résultat.
+
+    TAB_LINES = register(LineRule("tab_lines", ["\\t"]))
+
+    def check_file(file, context):
+        return {"tab_lines": len(scan_file(file, context)[TAB_LINES.name])}
+"""
+import re
+
+
+class LineRule:
+    """
+    Règle appliquée aux lignes contenant au moins un de `literals` (sans
+    retour à la ligne ; sans tenir compte de la casse si `ignore_case`).
+    `match(line)` retourne la valeur à retenir pour la ligne, ou None si la
+    règle ne s'y applique finalement pas ; sans `match`, toute ligne
+    contenant un littéral est retenue, sans même être décodée.
+    """
+
+    def __init__(self, name, literals, match=None, ignore_case=False):
+        self.name = name
+        self.literals = tuple(literal.casefold() for literal in literals) if ignore_case else tuple(literals)
+        self.match = match
+        self.ignore_case = ignore_case
+        # recherche dans les octets : sans casse, seulement pour des littéraux ASCII (bytes.lower)
+        self.byte_literals = None
+        if not ignore_case or all(literal.isascii() for literal in self.literals):
+            self.byte_literals = tuple(literal.encode("utf-8") for literal in self.literals)
+        # repli pour les textes dont casefold() change la longueur (et donc les positions)
+        self.pattern = re.compile("|".join(map(re.escape, self.literals)), re.IGNORECASE) if ignore_case else None
+
+
+_rules = {}
+
+
+def register(rule):
+    """Enregistre une règle (au chargement du module du check) et la retourne."""
+    _rules[rule.name] = rule
+    return rule
+
+
+def _occurrences(haystack, literals):
+    for literal in literals:
+        position = haystack.find(literal)
+        while position != -1:
+            yield position
+            position = haystack.find(literal, position + 1)
+
+
+def _text_positions(text):
+    """(règle, positions de ses littéraux) dans un texte décodé."""
+    folded = None
+    for rule in _rules.values():
+        if not rule.ignore_case:
+            yield rule, _occurrences(text, rule.literals)
+            continue
+
+        if folded is None:
+            folded = text.casefold()
+        if len(folded) == len(text):
+            yield rule, _occurrences(folded, rule.literals)
+        else:
+            yield rule, (found.start() for found in rule.pattern.finditer(text))
+
+
+def _bytes_positions(data):
+    """(règle, positions de ses littéraux) dans des octets ASCII."""
+    lowered = None
+    for rule in _rules.values():
+        if not rule.ignore_case:
+            yield rule, _occurrences(data, rule.byte_literals)
+            continue
+
+        if lowered is None:
+            lowered = data.lower()
+        yield rule, _occurrences(lowered, rule.byte_literals)
+
+
+def _scan(content, positions, newline, decode):
+    # lignes candidates : {début de ligne: [règles dont un littéral y apparaît]}
+    candidates = {}
+    for rule, rule_positions in positions:
+        for position in rule_positions:
+            start = content.rfind(newline, 0, position) + 1
+            rules = candidates.setdefault(start, [])
+            if not rules or rules[-1] is not rule:
+                rules.append(rule)
+
+    hits = {name: [] for name in _rules}
+    line_number = 1
+    counted = 0  # position jusqu'à laquelle les retours à la ligne ont été comptés
+    for start in sorted(candidates):
+        line_number += content.count(newline, counted, start)
+        counted = start
+
+        line = None
+        for rule in candidates[start]:
+            if rule.match is None:
+                hits[rule.name].append((line_number, True))
+                continue
+
+            if line is None:
+                end = content.find(newline, start)
+                line = decode(content[start:end] if end != -1 else content[start:])
+            value = rule.match(line)
+            if value is not None:
+                hits[rule.name].append((line_number, value))
+    return hits
+
+
+def scan(text):
+    """
+    Applique toutes les règles enregistrées au texte en un seul passage.
+    Retourne {nom de règle: [(numéro de ligne, valeur), ...]}, dans l'ordre
+    des lignes.
+    """
+    return _scan(text, _text_positions(text), "\n", str)
+
+
+def scan_bytes(data):
+    """
+    Comme scan, directement sur les octets d'un fichier ASCII sans \\r : les
+    lignes y sont délimitées comme dans le texte, leurs numéros sont comptés
+    sur les octets et seules les lignes passées à une fonction `match` sont
+    décodées.
+    """
+    return _scan(data, _bytes_positions(data), b"\n", bytes.decode)
+
+
+def _bytes_scannable(data):
+    # ailleurs, le décodage (erreurs UTF-8, casse Unicode) et la traduction des fins de ligne comptent
+    return (
+        data.isascii()
+        and b"\r" not in data
+        and all(rule.byte_literals is not None for rule in _rules.values())
+    )
+
+
+def scan_file(file, context):
+    """
+    Résultats de toutes les règles pour un fichier de la chart, calculés au
+    premier appel puis partagés par tous les checks qui le demandent. Le
+    fichier n'est décodé que s'il n'est pas en ASCII ou contient des \\r.
+    """
+    chart_file = context.get(file)
+    rules_key = tuple(_rules)
+    if chart_file.line_hits is None or chart_file.line_hits[0] != rules_key:
+        data = chart_file.data
+        if data is None:
+            raise chart_file.error
+        hits = scan_bytes(data) if _bytes_scannable(data) else scan(chart_file.text)
+        chart_file.line_hits = (rules_key, hits)
+    return chart_file.line_hits[1]
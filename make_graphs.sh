@@ -4,18 +4,20 @@ rm graphs_with_peaks_excluded/*
 rm code_smells_report.csv
 rm final_report.csv
 
-# Calcul des codes smells (ça écrit dans le fichier 'code_smells_report.csv' et le fichier 'code_smells_by_practice.csv')
+# Calcul des codes smells (ça écrit dans le fichier 'code_smells_report.csv', le fichier 'code_smells_by_practice.csv' et la table typée 'code_smells_results.sqlite')
 python code_smells_calculator.py
 
-# Join entre le fichier 'chart_infos.csv' et 'code_smells_report.csv' pour obtenir 'final_report.csv'
+# Join entre le fichier 'chart_infos.csv' et les résultats pour obtenir 'final_report.csv' (les graphs lisent directement 'code_smells_results.sqlite')
 python aggregate_csv.py
 
-# Création des graphs
-python compute_graphs.py
-python compute_graphs_peaks_excluded.py
-python compute_graphs_ratio_per_file.py
+# Création des graphs (les trois variantes 'graphs', 'graphs_with_peaks_excluded' et 'graphs_ratio_per_file' en un seul processus)
+python graphs.py
 
 python stacked_ratio_by_chart.py
+
+# Parcours de l'historique des dépôts, fait une seule fois pour les trois scripts suivants (écrit dans 'history_metrics.sqlite')
+python history_replay.py
+
 python generate_graphs_over_time.py
 python generate_practice_evolution.py
 
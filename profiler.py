@@ -0,0 +1,120 @@
+"""
+Mesures de `code_smells_calculator.py --profile` : pour chaque (chart,
+check), le temps écoulé, le temps CPU, les octets lus sur le disque et le
+pic de mémoire allouée pendant le check (tracemalloc). La construction du
+contexte de la chart (parcours de son dossier, "ChartContext") et le calcul
+du nombre de lignes ("computeLinesOfChart") sont mesurés de la même façon.
+
+Un check peut en plus être exécuté sous cProfile (`--profile-check`) : ses
+appels sur toutes les charts sont cumulés dans un même profil.
+
+Les mesures sont écrites triées par temps décroissant dans
+`profile_report.json` et `profile_report.csv`, et résumées à l'écran (les
+N mesures, checks et charts les plus coûteux).
+"""
+import csv
+import json
+import time
+import cProfile
+import pstats
+import tracemalloc
+
+PROFILE_JSON = "profile_report.json"
+PROFILE_CSV = "profile_report.csv"
+PROFILE_FIELDS = ["chart", "check", "wall_s", "cpu_s", "bytes_read", "peak_bytes"]
+
+
+class Profiler:
+    def __init__(self, profiled_check=None):
+        self.records = []
+        self.profiled_check = profiled_check # NAME du check passé sous cProfile
+        self.cprofile = cProfile.Profile() if profiled_check else None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, chart, name, context, function):
+        """Appelle `function()` et enregistre ses mesures sous (chart, name)."""
+        source = context.source if context is not None else None
+        bytes_before = getattr(source, "bytes_read", 0)
+        memory_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        profile = self.cprofile if name == self.profiled_check else None
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            return function()
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self.records.append({
+                "chart": chart,
+                "check": name,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "bytes_read": getattr(source, "bytes_read", 0) - bytes_before,
+                "peak_bytes": max(tracemalloc.get_traced_memory()[1] - memory_before, 0),
+            })
+
+    def take_records(self):
+        """Mesures enregistrées depuis le dernier appel (renvoyées par les workers du mode --jobs)."""
+        records, self.records = self.records, []
+        return records
+
+
+def unmeasured(chart, name, context, function):
+    """Remplace Profiler.measure quand le profilage n'est pas demandé."""
+    return function()
+
+
+def write_report(records, json_path=PROFILE_JSON, csv_path=PROFILE_CSV):
+    ordered = sorted(records, key=lambda record: record["wall_s"], reverse=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(ordered, f, indent=2)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+        writer.writeheader()
+        writer.writerows(ordered)
+
+
+def _totals(records, key):
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record[key], {"wall_s": 0, "cpu_s": 0, "bytes_read": 0, "peak_bytes": 0})
+        total["wall_s"] += record["wall_s"]
+        total["cpu_s"] += record["cpu_s"]
+        total["bytes_read"] += record["bytes_read"]
+        total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+    return sorted(totals.items(), key=lambda item: item[1]["wall_s"], reverse=True)
+
+
+def _line(label, wall_s, cpu_s, bytes_read, peak_bytes):
+    return f"  {label:<60} {wall_s * 1000:10.1f} ms  CPU {cpu_s * 1000:10.1f} ms  {bytes_read / 1024:10.1f} Kio lus  pic {peak_bytes / 1024:10.1f} Kio"
+
+
+def print_summary(records, top=10):
+    total = sum(record["wall_s"] for record in records)
+    print(f"\n--- Profil ({len(records)} mesures, {total:.2f} s au total) ---")
+
+    print("\nChecks les plus coûteux (toutes charts) :")
+    for name, values in _totals(records, "check")[:top]:
+        print(_line(name, **values))
+
+    print("\nCharts les plus coûteuses (tous checks) :")
+    for chart, values in _totals(records, "chart")[:top]:
+        print(_line(chart, **values))
+
+    print("\nMesures (chart, check) les plus coûteuses :")
+    for record in sorted(records, key=lambda record: record["wall_s"], reverse=True)[:top]:
+        print(_line(f"{record['chart']} / {record['check']}", record["wall_s"], record["cpu_s"], record["bytes_read"], record["peak_bytes"]))
+
+
+def print_cprofile(profiler, path, top=20):
+    """Enregistre le profil cProfile du check choisi dans `path` et affiche ses fonctions les plus coûteuses."""
+    profiler.cprofile.dump_stats(path)
+    print(f"\nProfil cProfile de {profiler.profiled_check} ({path}) :")
+    pstats.Stats(path).sort_stats("cumulative").print_stats(top)
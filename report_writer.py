@@ -0,0 +1,96 @@
+"""
+Écriture au fil de l'eau des rapports CSV de code_smells_calculator.py.
+
+Les lignes d'une chart sont ajoutées à `code_smells_by_practice.csv` puis à
+`code_smells_report.csv` dès que son analyse est terminée, et les deux
+fichiers sont synchronisés sur le disque (fsync) avant de passer à la chart
+suivante : une interruption ne perd que la chart en cours. La ligne de
+`code_smells_report.csv` est écrite en dernier et sert de point de reprise :
+avec `resume`, les charts qui y figurent déjà ne sont pas ré-analysées, et
+les lignes d'une chart interrompue en cours d'écriture sont retirées.
+
+Si un ResultsStore est fourni, chaque chart y est aussi enregistrée (avant
+les CSV, en une transaction) ; à la reprise, il est reconstruit à partir des
+lignes conservées dans les CSV.
+"""
+import os
+import csv
+
+REPORT_FILE = "code_smells_report.csv"
+BY_PRACTICE_FILE = "code_smells_by_practice.csv"
+REPORT_HEADER = ["Chart", "Code Smells", "Total Lines", "Total Files", "Ratio"]
+BY_PRACTICE_HEADER = ["Chart", "Practice", "Code Smells", "Total Lines", "Ratio"]
+
+
+def _read_rows(path, width):
+    """Lignes complètes (hors en-tête) d'un rapport, [] s'il n'existe pas."""
+    try:
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+    except OSError:
+        return []
+    # une ligne tronquée par une interruption n'a pas toutes ses colonnes
+    return [row for row in rows[1:] if len(row) == width]
+
+
+def _rewrite(path, header, rows):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ReportWriter:
+    def __init__(self, report_path=REPORT_FILE, by_practice_path=BY_PRACTICE_FILE, resume=False, store=None):
+        self.report_path = report_path
+        self.by_practice_path = by_practice_path
+        self.store = store
+        self.done = {} # nom de chart -> (code smells, lignes, fichiers) déjà écrits
+
+        report_rows, by_practice_rows = [], []
+        if resume:
+            for row in _read_rows(report_path, len(REPORT_HEADER)):
+                try:
+                    self.done[row[0]] = (int(row[1]), int(row[2]), int(row[3]))
+                except ValueError:
+                    continue
+                report_rows.append(row)
+            by_practice_rows = [
+                row for row in _read_rows(by_practice_path, len(BY_PRACTICE_HEADER)) if row[0] in self.done
+            ]
+        _rewrite(report_path, REPORT_HEADER, report_rows)
+        _rewrite(by_practice_path, BY_PRACTICE_HEADER, by_practice_rows)
+        if store is not None:
+            store.reset(report_rows, by_practice_rows)
+
+        self.report_file = open(report_path, "a", newline="")
+        self.by_practice_file = open(by_practice_path, "a", newline="")
+        self.report = csv.writer(self.report_file)
+        self.by_practice = csv.writer(self.by_practice_file)
+
+    def write(self, chart_name, result):
+        """Ajoute les lignes d'une chart (résultat de scan_chart) et les synchronise sur le disque."""
+        code_smells, lines, files = result["total"], result["lines"], result["files"]
+        if self.store is not None:
+            self.store.put_chart(chart_name, len(self.done), result)
+
+        for practice, count in result["by_practice"].items():
+            ratio = count / lines if lines > 0 else 0
+            self.by_practice.writerow([chart_name, practice, count, lines, ratio])
+        self.by_practice_file.flush()
+        os.fsync(self.by_practice_file.fileno())
+
+        ratio = code_smells / lines if lines > 0 else 0
+        self.report.writerow([chart_name, code_smells, lines, files, ratio])
+        self.report_file.flush()
+        os.fsync(self.report_file.fileno())
+
+        self.done[chart_name] = (code_smells, lines, files)
+
+    def close(self):
+        self.by_practice_file.close()
+        self.report_file.close()
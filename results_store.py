@@ -0,0 +1,112 @@
+"""
+Table typée des résultats de code_smells_calculator.py.
+
+Le calculateur y écrit, chart par chart, le nombre de code smells, de
+lignes et de fichiers de chaque chart (`charts`) et le détail par pratique
+(`practices`) ; aggregate_csv.py y ajoute les métadonnées de
+`chart_infos.csv` (`chart_infos`). Les jointures sont faites une fois pour
+toutes par deux vues, lues directement par les scripts de graphes :
+  - final_report : mêmes colonnes que `final_report.csv` ;
+  - by_practice  : mêmes colonnes que `code_smells_by_practice.csv`.
+
+    df = pd.read_sql_query("SELECT * FROM final_report", ResultsStore().connection)
+"""
+import sqlite3
+
+RESULTS_FILE = "code_smells_results.sqlite"
+
+
+class ResultsStore:
+    def __init__(self, path=RESULTS_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS charts (
+                chart TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                code_smells INTEGER NOT NULL,
+                total_lines INTEGER NOT NULL,
+                total_files INTEGER NOT NULL,
+                ratio REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS practices (
+                chart TEXT NOT NULL,
+                practice TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                code_smells INTEGER NOT NULL,
+                total_lines INTEGER NOT NULL,
+                ratio REAL NOT NULL,
+                PRIMARY KEY (chart, practice)
+            );
+            CREATE TABLE IF NOT EXISTS chart_infos (
+                chart TEXT PRIMARY KEY,
+                stars INTEGER,
+                days_ago REAL,
+                origin TEXT
+            );
+            CREATE VIEW IF NOT EXISTS final_report AS
+                SELECT c.chart AS Chart, i.stars, i.days_ago, i.origin,
+                       c.code_smells, c.total_lines, c.total_files, c.ratio
+                FROM charts c JOIN chart_infos i ON i.chart = c.chart
+                ORDER BY c.position;
+            CREATE VIEW IF NOT EXISTS by_practice AS
+                SELECT p.chart AS Chart, p.practice AS Practice, p.code_smells AS "Code Smells",
+                       p.total_lines AS "Total Lines", p.ratio AS Ratio
+                FROM practices p JOIN charts c ON c.chart = p.chart
+                ORDER BY c.position, p.position;
+            """
+        )
+        self.connection.commit()
+
+    def reset(self, report_rows=(), by_practice_rows=()):
+        """
+        Remplace les résultats par ceux des lignes déjà écrites dans les CSV
+        (reprise d'une exécution interrompue), ou les vide.
+        """
+        self.connection.execute("DELETE FROM practices")
+        self.connection.execute("DELETE FROM charts")
+        self.connection.executemany(
+            "INSERT INTO charts VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (chart, position, int(code_smells), int(lines), int(files), float(ratio))
+                for position, (chart, code_smells, lines, files, ratio) in enumerate(report_rows)
+            ],
+        )
+        self.connection.executemany(
+            "INSERT INTO practices VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (chart, practice, position, int(code_smells), int(lines), float(ratio))
+                for position, (chart, practice, code_smells, lines, ratio) in enumerate(by_practice_rows)
+            ],
+        )
+        self.connection.commit()
+
+    def put_chart(self, chart_name, position, result):
+        """Résultat de scan_chart pour une chart, enregistré en une transaction."""
+        code_smells, lines, files = result["total"], result["lines"], result["files"]
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?, ?, ?)",
+                (chart_name, position, code_smells, lines, files, code_smells / lines if lines > 0 else 0),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO practices VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (chart_name, practice, index, count, lines, count / lines if lines > 0 else 0)
+                    for index, (practice, count) in enumerate(result["by_practice"].items())
+                ],
+            )
+
+    def put_chart_infos(self, chart_infos):
+        """Remplace les métadonnées des charts : {nom: (étoiles, jours depuis la release, provenance)}."""
+        with self.connection:
+            self.connection.execute("DELETE FROM chart_infos")
+            self.connection.executemany(
+                "INSERT INTO chart_infos VALUES (?, ?, ?, ?)",
+                [(chart,) + tuple(info) for chart, info in chart_infos.items()],
+            )
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
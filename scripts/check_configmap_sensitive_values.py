@@ -1,87 +1,113 @@
 import re
 
+from line_rules import LineRule, register, scan_file
 
-def check(yaml_files, chart):
+
+NAME = "configmap_sensitive_values"
+SCOPE = "file"
+FILES = ("chart_yaml", "values", "template", "crd", "other")
+VERSION = "1"
+
+# Regex pour détecter les clés sensibles (password/token)
+sensitive_key_pattern = re.compile(
+    r'^\s*([A-Za-z0-9_-]*(password|token)[A-Za-z0-9_-]*)\s*:\s*(.*)$',
+    re.IGNORECASE
+)
+
+# Regex pour détecter les templates Helm / Go
+template_pattern = re.compile(r'{{.*?}}')
+
+
+def sensitive_key(line):
     """
-    Detecte un code smell lorsque :
-    - le fichier contient 'kind: ConfigMap'
-    - ET contient une clé YAML contenant 'password' ou 'token' (case-insensitive)
-    - ET la clé ne contient pas 'file', 'url' ou 'path'
-    - ET la valeur de cette clé :
-        - ne contient pas '.Values'
-        - n'est pas vide
-        - n'est pas une chaîne vide ("", '')
-        - ne contient pas 'true', 'false' ou 'file' (case-insensitive)
-        - ne contient pas de template {{ ... }}
+    Clé sensible définie en clair sur la ligne, ou None.
     """
+    match = sensitive_key_pattern.match(line)
+    if not match:
+        return None
 
-    violations = []
+    key = match.group(1)
+    value = match.group(3).strip()
 
-    # Regex pour détecter les clés sensibles (password/token)
-    sensitive_key_pattern = re.compile(
-        r'^\s*([A-Za-z0-9_-]*(password|token)[A-Za-z0-9_-]*)\s*:\s*(.*)$',
-        re.IGNORECASE
-    )
+    key_lower = key.lower()
+    value_lower = value.lower()
 
-    # Regex pour détecter les templates Helm / Go
-    template_pattern = re.compile(r'{{.*?}}')
+    # Ignorer les clés liées aux fichiers, URLs ou chemins
+    if any(word in key_lower for word in ("file", "url", "path")):
+        return None
 
-    for file in yaml_files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                content = f.read()
-                lines = content.split('\n')
+    # Ignorer les valeurs provenant de Helm (.Values)
+    if ".Values" in value:
+        return None
 
-            # Condition 1 : kind: ConfigMap présent
-            if not any("kind: ConfigMap" in line for line in lines):
-                continue
+    # Ignorer les valeurs vides ou chaînes vides
+    if value in ("", "''", '""'):
+        return None
 
-            # Chercher les clés sensibles
-            for i, line in enumerate(lines):
-                match = sensitive_key_pattern.match(line)
-                if not match:
-                    continue
+    # Ignorer les booléens, fichiers, etc.
+    if any(word in value_lower for word in ("true", "false", "file")):
+        return None
 
-                key = match.group(1)
-                value = match.group(3).strip()
+    # Ignorer les valeurs templatisées {{ ... }}
+    if template_pattern.search(value):
+        return None
 
-                key_lower = key.lower()
-                value_lower = value.lower()
+    return key
 
-                # Ignorer les clés liées aux fichiers, URLs ou chemins
-                if any(word in key_lower for word in ("file", "url", "path")):
-                    continue
 
-                # Ignorer les valeurs provenant de Helm (.Values)
-                if ".Values" in value:
-                    continue
+CONFIGMAP_KIND = register(LineRule("configmap_kind", ["kind: ConfigMap"]))
+SENSITIVE_KEYS = register(LineRule("sensitive_keys", ["password", "token"], match=sensitive_key, ignore_case=True))
 
-                # Ignorer les valeurs vides ou chaînes vides
-                if value in ("", "''", '""'):
-                    continue
 
-                # Ignorer les booléens, fichiers, etc.
-                if any(word in value_lower for word in ("true", "false", "file")):
-                    continue
+def check_file(file, context):
+    """
+    Retourne les clés sensibles définies en clair dans un fichier,
+    sous la forme de couples (numéro de ligne, clé).
+    """
+    hits = scan_file(file, context)
 
-                # Ignorer les valeurs templatisées {{ ... }}
-                if template_pattern.search(value):
-                    continue
+    # Condition 1 : kind: ConfigMap présent
+    if not hits[CONFIGMAP_KIND.name]:
+        return {"violations": []}
 
-                message = (
-                    f"{file}:{i+1} → Clé sensible '{key}' "
-                    "définie en clair dans un ConfigMap."
-                )
+    # Chercher les clés sensibles
+    return {"violations": [[line_number, key] for line_number, key in hits[SENSITIVE_KEYS.name]]}
 
-                # Affichage immédiat du problème détecté
-                print(message)
 
-                violations.append(message)
+def check(yaml_files, chart, context):
+    """
+    Detecte un code smell lorsque :
+    - le fichier contient 'kind: ConfigMap'
+    - ET contient une clé YAML contenant 'password' ou 'token' (case-insensitive)
+    - ET la clé ne contient pas 'file', 'url' ou 'path'
+    - ET la valeur de cette clé :
+        - ne contient pas '.Values'
+        - n'est pas vide
+        - n'est pas une chaîne vide ("", '')
+        - ne contient pas 'true', 'false' ou 'file' (case-insensitive)
+        - ne contient pas de template {{ ... }}
+    """
 
+    violations = []
+
+    for file in yaml_files:
+        try:
+            result = context.run_file_check(check_file, file)
         except Exception:
             # Ignorer les fichiers illisibles
             continue
 
+        for line_number, key in result["violations"]:
+            message = (
+                f"{file}:{line_number} → Clé sensible '{key}' "
+                "définie en clair dans un ConfigMap."
+            )
+
+            # Affichage du problème détecté
+            print(message)
+
+            violations.append(message)
+
     return {
         "name": "configmap_sensitive_values",
         "success": len(violations) == 0,
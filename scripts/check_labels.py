@@ -1,6 +1,11 @@
 import re
 import os
 
+NAME = "standard_labels"
+SCOPE = "file"
+FILES = ("template", "crd", "other", "values")
+VERSION = "1"
+
 RECOMMENDED = [
     "app.kubernetes.io/name",
     "app.kubernetes.io/instance",
@@ -8,44 +13,47 @@ RECOMMENDED = [
     "app.kubernetes.io/managed-by",
 ]
 
-NON_MANIFEST_FILES = [
-    "Chart.yaml",
-    "values.yaml",
-]
-
 LABEL_HELPER_PATTERN = re.compile(r'include\s+"[^"]*labels"')
 
 
-def check(yaml_files, chart):
+def check_file(file, context):
     """
-    Vérifie que chaque manifest YAML applique les labels recommandés,
-    soit via un helper, soit via les labels présents directement.
+    Retourne les labels recommandés absents d'un manifest
+    (aucun si le manifest passe par un helper de labels).
     """
+    content = context.text(file)
+    lines = context.lines(file)
 
-    failures = []
+    # 1) Helper detected ?
+    if LABEL_HELPER_PATTERN.search(content):
+        return {"missing": []}  # this file is OK
+
+    # 2) Otherwise check for direct labels
+    present = set()
 
-    for file in yaml_files:
-        if os.path.basename(file) in NON_MANIFEST_FILES:
-            continue  # skip non-manifest files
-        with open(file, "r") as f:
-            content = f.read()
-            lines = content.splitlines()
+    for line in lines:
+        stripped = line.strip()
+        for label in RECOMMENDED:
+            if stripped.startswith(label + ":"):
+                present.add(label)
 
-        # 1) Helper detected ?
-        if LABEL_HELPER_PATTERN.search(content):
-            continue  # this file is OK
+    return {"missing": [l for l in RECOMMENDED if l not in present]}
 
-        # 2) Otherwise check for direct labels
-        present = set()
 
-        for line in lines:
-            stripped = line.strip()
-            for label in RECOMMENDED:
-                if stripped.startswith(label + ":"):
-                    present.add(label)
+def check(yaml_files, chart, context):
+    """
+    Vérifie que chaque manifest YAML applique les labels recommandés,
+    soit via un helper, soit via les labels présents directement.
+    """
+
+    failures = []
+
+    for file in yaml_files: # Chart.yaml n'est pas transmis (FILES)
+        if os.path.basename(file) == "values.yaml":
+            continue  # skip non-manifest file
 
-        if len(present) != len(RECOMMENDED):
-            missing = [l for l in RECOMMENDED if l not in present]
+        missing = context.run_file_check(check_file, file)["missing"]
+        if missing:
             failures.append((file, missing))
 
     # Final result
@@ -1,49 +1,111 @@
-def count_embedded_objects_from_text(yaml_content):
+from itertools import zip_longest
+
+NAME = "count_embedded_objects"
+SCOPE = "file"
+FILES = ("values",)
+VERSION = "2"
+
+
+def _is_block_scalar(value):
+    """Valeur introduisant un scalaire multi-lignes : `|`, `>`, `|-`, `>+`, `|2`..."""
+    return value[:1] in ("|", ">") and all(c in "+-0123456789" for c in value[1:])
+
+
+def scan_values_text(yaml_content):
     """
-    Compte les objets imbriqués dans un contenu YAML sans utiliser le module yaml.
-    Un objet imbriqué est détecté comme une clé ayant une valeur indentée (non-commentaire).
+    Parcourt une seule fois un contenu YAML, sans le module yaml, avec une
+    pile des indentations des lignes englobantes. Retourne :
+      - embedded : le nombre de clés au niveau racine ayant une valeur
+        indentée (non-commentaire), voir count_embedded_objects_from_text ;
+      - depths : l'histogramme des profondeurs d'imbrication, `depths[d]`
+        étant le nombre de lignes de contenu à la profondeur d (0 = racine) ;
+      - max_depth : la profondeur maximale (0 si le fichier est vide).
+
+    Le contenu d'un scalaire multi-lignes (`key: |`) n'est pas compté comme
+    imbriqué, et le contenu d'un élément de liste (`- `) est deux niveaux
+    sous la clé qui contient la liste (la liste, puis l'élément), même si la
+    liste est écrite sans indentation (`key:` puis `- item`).
     """
     embedded_count = 0
-    lines = yaml_content.split('\n')
-    
-    for i, line in enumerate(lines):
-        # Ignorer les lignes vides et les commentaires
+    pending = False     # clé racine dont on cherche encore la première ligne indentée
+    indents = []        # indentations des lignes englobantes
+    block = None        # indentation de la clé d'un scalaire multi-lignes en cours
+    depths = []
+
+    for line in yaml_content.split('\n'):
         stripped = line.lstrip()
-        if not stripped or stripped.startswith('#'):
+        if not stripped:
             continue
-        
-        # Vérifier si c'est une clé au niveau racine (pas indentée ou indentation = 0)
-        if not line.startswith(' ') and not line.startswith('\t'):
-            # C'est une clé potentielle
-            if ':' in line and not stripped.startswith('-'):
-                # Chercher la première ligne indentée non-vide après cette clé
-                # (en ignorant les commentaires)
-                for j in range(i + 1, len(lines)):
-                    next_line = lines[j]
-                    next_stripped = next_line.lstrip()
-                    
-                    # Ignorer les lignes vides
-                    if not next_stripped:
-                        continue
-                    
-                    # Si on trouve une ligne indentée (pas un commentaire), c'est un objet imbriqué
-                    if len(next_line) - len(next_line.lstrip()) > 0:
-                        # Mais on doit vérifier que ce n'est pas une clé au niveau racine
-                        if next_stripped.startswith('#'):
-                            # C'est un commentaire, on continue
-                            continue
-                        else:
-                            # C'est du contenu imbriqué
-                            embedded_count += 1
-                            break
-                    else:
-                        # Ligne sans indentation trouvée = pas d'objet imbriqué
-                        break
-    
-    return embedded_count
+        indent = len(line) - len(stripped)
+        first = stripped[0]
+
+        if first == '#':
+            if indent == 0:
+                pending = False
+            continue
+
+        # --- comptage des objets imbriqués au niveau racine ---
+        if pending and indent > 0:
+            embedded_count += 1
+        pending = first != '-' and ':' in stripped and (indent == 0 or line[0] not in ' \t')
+
+        # --- profondeur d'imbrication ---
+        if block is not None:
+            if indent > block:
+                continue
+            block = None
+
+        if first == '-' and stripped[1:2] in ('', ' ', '\t'):
+            # le contenu de l'élément est un niveau sous le tiret
+            while indents and indents[-1] > indent:
+                indents.pop()
+            indents.append(indent + 1)
+            indents.append(indent + 2)
+        else:
+            while indents and indents[-1] >= indent:
+                indents.pop()
+            indents.append(indent)
+        depth = len(indents) - 1
+
+        if depth < len(depths):
+            depths[depth] += 1
+        else:
+            depths.extend([0] * (depth - len(depths)))
+            depths.append(1)
+
+        if ('|' in stripped or '>' in stripped) and _is_block_scalar(stripped.partition(': ')[2].split(' #', 1)[0].strip()):
+            block = indents[-1] if first == '-' else indent
+
+    return {
+        "embedded": embedded_count,
+        "depths": depths,
+        "max_depth": len(depths) - 1 if depths else 0,
+    }
+
+
+def count_embedded_objects_from_text(yaml_content):
+    """
+    Compte les objets imbriqués dans un contenu YAML sans utiliser le module yaml.
+    Un objet imbriqué est détecté comme une clé ayant une valeur indentée (non-commentaire).
+    """
+    return scan_values_text(yaml_content)["embedded"]
+
+
+def check_file(file, context):
+    """
+    Compte les objets imbriqués d'un fichier values.yaml.
+    """
+    content = context.text(file)
+    scan = scan_values_text(content)
+    return {
+        "lines": content.count('\n') + 1,
+        "embedded": scan["embedded"],
+        "depths": scan["depths"],
+        "max_depth": scan["max_depth"],
+    }
 
 
-def check(yaml_files, chart):
+def check(yaml_files, chart, context):
     """
     Vérifie les objets imbriqués dans les fichiers YAML.
     
@@ -60,6 +122,8 @@ def check(yaml_files, chart):
     
     total_embedded = 0
     total_lines = 0
+    max_depth = 0
+    depths = []
     files_checked = []
     
     # Vérifier uniquement values.yaml (seul fichier définissant les variables)
@@ -68,13 +132,13 @@ def check(yaml_files, chart):
     # Analyser les fichiers
     for file in files_to_check:
         try:
-            with open(file, "r", encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-                total_lines += len(lines)
+            result = context.run_file_check(check_file, file)
+            total_lines += result["lines"]
+            max_depth = max(max_depth, result["max_depth"])
+            depths = [a + b for a, b in zip_longest(depths, result["depths"], fillvalue=0)]
             
             # Compter les objets imbriqués
-            embedded = count_embedded_objects_from_text(content)
+            embedded = result["embedded"]
             if embedded > 0:
                 total_embedded += embedded
                 files_checked.append(f"{file}: {embedded} objet(s) imbriqué(s)")
@@ -84,7 +148,7 @@ def check(yaml_files, chart):
             continue
     
     # Résultat global
-    details_msg = f"{total_embedded} objet(s) imbriqué(s) / {total_lines} lignes YAML analysées"
+    details_msg = f"{total_embedded} objet(s) imbriqué(s) / {total_lines} lignes YAML analysées, profondeur max {max_depth}"
     if files_checked:
         details_msg += " - " + "; ".join(files_checked)
     
@@ -93,4 +157,6 @@ def check(yaml_files, chart):
         "success": total_embedded == 0,
         "code_smells": total_embedded,
         "details": details_msg,
+        "max_depth": max_depth,
+        "depths": depths,
     }
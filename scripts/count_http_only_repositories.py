@@ -1,11 +1,31 @@
-import os
+from line_rules import LineRule, register, scan_file
 
 """
 Verification de la mauvaise pratique :
 'Il ne faut pas utiliser des repositories en HTTP uniquement (sans HTTPS)'
 """
 
-def check(yaml_files, chart):
+NAME = "count_http_only_repositories"
+SCOPE = "file"
+FILES = ("chart_yaml", "values", "template", "crd", "other")
+VERSION = "1"
+
+HTTP_REPOSITORIES = register(
+    LineRule("http_repositories", ["http://"], match=lambda line: "repository" in line or None)
+)
+
+
+def check_file(file, context):
+    """
+    Compte les lignes d'un fichier référençant un repository en HTTP.
+    """
+    return {
+        "lines": context.line_count(file),
+        "http_repositories": len(scan_file(file, context)[HTTP_REPOSITORIES.name]),
+    }
+
+
+def check(yaml_files, chart, context):
     """
     Vérifie toutes les YAML d'une chart pour compter les lignes contenant
     des tabulations. Retourne :
@@ -19,11 +39,10 @@ def check(yaml_files, chart):
 
     for file in yaml_files:
         try:
-            with open(file, "r") as f:
-                lines = f.readlines()
+            result = context.run_file_check(check_file, file)
 
-            total_lines += len(lines)
-            total_http_repositories += sum(1 for l in lines if "http://" in l and "repository" in l)
+            total_lines += result["lines"]
+            total_http_repositories += result["http_repositories"]
 
         except Exception as e:
             return {
@@ -1,12 +1,14 @@
-import os
-import yaml
-
 """
 Vérifie la mauvaise pratique du lien suivant : https://helm.sh/docs/chart_best_practices/dependencies#versions
 
 'Il ne faut jamais fixer la version d'une dépendance précisèment, mais toujours utiliser des plages de versions.'
 """
 
+NAME = "count_nonrange_versions"
+SCOPE = "file"
+FILES = ("chart_yaml",)
+VERSION = "2"
+
 def is_the_dependency_version_nonrange(version):
     """
     Vérifie si une version est non-range (ex: '1.2.3') ou range (ex: '^1.2.3', '~1.2.3', '>=1.2.3', '<=1.2.3', '*')
@@ -14,7 +16,20 @@ def is_the_dependency_version_nonrange(version):
     nonrange_indicators = ["~", "^", ">=", "<=", "*"]
     return not any(indicator in version for indicator in nonrange_indicators)
 
-def check(yaml_files, chart):
+def check_file(file, context):
+    """
+    Compte les dépendances à version non-range déclarées dans un Chart.yaml.
+    """
+    metadata = context.chart_yaml(file)
+    if metadata.error is not None:
+        raise metadata.error
+
+    # YAML vide ou sans dépendances : soit ce n'est pas un Chart.yaml valide,
+    # soit la chart n'a pas de dépendances
+    dependencies = metadata.dependencies or []
+    return {"nonrange_versions": sum(1 for l in dependencies if "version" in l and is_the_dependency_version_nonrange(l["version"]))}
+
+def check(yaml_files, chart, context):
     """
     Vérifie toutes les YAML d'une chart pour compter les lignes contenant
     des versions non-range. Retourne :
@@ -26,36 +41,21 @@ def check(yaml_files, chart):
     total_nonrange_versions_lines = 0
     total_lines = 0
 
-    for file in yaml_files:
-        try:
-            with open(file, "r") as f:
-                lines = f.readlines()
-                total_lines += len(lines)
-
-            if "Chart.yaml" not in file:
-                continue # on ne traite que les Chart.yaml
-
-            # Charger YAML
-            with open(file, "r") as f:
-                data = yaml.safe_load(f)
-
-            # YAML vide
-            if data is None:
-                continue
+    try:
+        # le détail rapporte les lignes de toutes les YAML de la chart, pas seulement des Chart.yaml
+        for file in context.yaml_files:
+            total_lines += context.line_count(file)
 
-            try:
-                total_nonrange_versions_lines += sum(1 for l in data["dependencies"] if "version" in l and is_the_dependency_version_nonrange(l["version"]))
-            except KeyError:
-                # le fichier n'a pas de dépendances
-                # soit ce n'est pas un Chart.yml valide, soit la chart n'a pas de dépendances
-                continue
+        for file in yaml_files: # uniquement les Chart.yaml (FILES)
+            result = context.run_file_check(check_file, file)
+            total_nonrange_versions_lines += result["nonrange_versions"]
 
-        except Exception as e:
-            return {
-                "name": "count_nonrange_versions",
-                "success": False,
-                "details": f"Erreur lors de la lecture du fichier {file} : {e}",
-            }
+    except Exception as e:
+        return {
+            "name": "count_nonrange_versions",
+            "success": False,
+            "details": f"Erreur lors de la lecture du fichier {file} : {e}",
+        }
 
     return {
         "name": "count_nonrange_versions",
@@ -1,7 +1,24 @@
-import os
+from line_rules import LineRule, register, scan_file
 
+NAME = "count_tabs"
+SCOPE = "file"
+FILES = ("chart_yaml", "values", "template", "crd", "other")
+VERSION = "1"
 
-def check(yaml_files, chart):
+TAB_LINES = register(LineRule("tab_lines", ["\t"]))
+
+
+def check_file(file, context):
+    """
+    Compte les lignes d'un fichier contenant une tabulation.
+    """
+    return {
+        "lines": context.line_count(file),
+        "tab_lines": len(scan_file(file, context)[TAB_LINES.name]),
+    }
+
+
+def check(yaml_files, chart, context):
     """
     Vérifie toutes les YAML d'une chart pour compter les lignes contenant
     des tabulations. Retourne :
@@ -15,11 +32,10 @@ def check(yaml_files, chart):
 
     for file in yaml_files:
         try:
-            with open(file, "r") as f:
-                lines = f.readlines()
+            result = context.run_file_check(check_file, file)
 
-            total_lines += len(lines)
-            total_tab_lines += sum(1 for l in lines if "\t" in l)
+            total_lines += result["lines"]
+            total_tab_lines += result["tab_lines"]
 
         except Exception as e:
             return {
@@ -1,8 +1,13 @@
 import os
 import re
 
+NAME = "has_helper_file"
+SCOPE = "chart"
+FILES = ("helper",)
+VERSION = "1"
 
-def check(yaml_files, chart):
+
+def check(yaml_files, chart, context):
     """
     Vérifie la présence d'un fichier helper dans les charts Helm.
     Vérifie aussi que ce fichier contient le motif 'define "*.labels"'.
@@ -16,24 +21,20 @@ def check(yaml_files, chart):
     labels_define_found = False
     helper_file_path = None
 
-    # Chercher le fichier _helpers.tpl
-    for root, dirs, files in os.walk(chart):
-        for file in files:
-            if file == "_helpers.tpl":
-                helper_file_found = True
-                helper_file_path = os.path.join(root, file)
-                break
-        if helper_file_found:
+    # Chercher le fichier _helpers.tpl parmi les .tpl de la chart (FILES), dans l'ordre du parcours
+    for file in yaml_files:
+        if os.path.basename(file) == "_helpers.tpl":
+            helper_file_found = True
+            helper_file_path = file
             break
 
     # Vérifier le contenu du fichier _helpers.tpl
     if helper_file_found and helper_file_path:
         try:
-            with open(helper_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Chercher le motif 'define "*.labels"'
-                if re.search(r'define\s+"[^"]+\.labels"', content):
-                    labels_define_found = True
+            content = context.text(helper_file_path)
+            # Chercher le motif 'define "*.labels"'
+            if re.search(r'define\s+"[^"]+\.labels"', content):
+                labels_define_found = True
         except Exception as e:
             return {
                 "name": "has_helper_file",
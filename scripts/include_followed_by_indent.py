@@ -1,8 +1,57 @@
 import os
 import re
 
-def check(yaml_files, chart):
-    if not yaml_files:
+from line_rules import LineRule, register, scan_file
+
+NAME = "include_indent_required"
+SCOPE = "file"
+FILES = ("template", "helper")
+VERSION = "1"
+
+include_pattern = re.compile(r"{{\s*include\s+\"[^\"]+\"\s*\.\s*([^}]*)}}")
+indent_pattern = re.compile(r"\|\s*(nindent|indent)\s+\d+")
+
+
+def include_violation(line):
+    """
+    "no_pipe" ou "no_indent" pour un include seul sur sa ligne sans
+    indent/nindent, sinon None.
+    """
+    stripped = line.strip()
+
+    # 🔹 Include inline → pas de règle d'indentation
+    if not (stripped.startswith("{{") and stripped.endswith("}}")):
+        return None
+
+    match = include_pattern.search(line)
+    if not match:
+        return None
+
+    pipe_section = match.group(1)
+
+    # Include seul sur sa ligne → indent requis
+    if "|" not in pipe_section:
+        return "no_pipe"
+
+    if not indent_pattern.search(pipe_section):
+        return "no_indent"
+    return None
+
+
+INCLUDE_WITHOUT_INDENT = register(LineRule("include_without_indent", ["include"], match=include_violation))
+
+
+def check_file(file, context):
+    """
+    Retourne les include seuls sur leur ligne sans indent/nindent, sous la
+    forme de couples (numéro de ligne, "no_pipe" ou "no_indent").
+    """
+    hits = scan_file(file, context)[INCLUDE_WITHOUT_INDENT.name]
+    return {"violations": [[line_number, kind] for line_number, kind in hits]}
+
+
+def check(yaml_files, chart, context):
+    if not context.yaml_files:
         return {
             "name": "include_indent_required",
             "success": True,
@@ -10,16 +59,9 @@ def check(yaml_files, chart):
             "details": "Aucun fichier YAML fourni, check ignoré."
         }
 
-    chart_path = os.path.dirname(yaml_files[0])
-    while chart_path and os.path.basename(chart_path) not in ("charts", ""):
-        parent = os.path.dirname(chart_path)
-        if os.path.basename(parent) == "charts":
-            break
-        chart_path = parent
+    templates_dir = os.path.join(chart, "templates")
 
-    templates_dir = os.path.join(chart_path, "templates")
-
-    if not os.path.exists(templates_dir):
+    if not context.exists(templates_dir):
         return {
             "name": "include_indent_required",
             "success": True,
@@ -29,46 +71,20 @@ def check(yaml_files, chart):
 
     violations = []
 
-    include_pattern = re.compile(r"{{\s*include\s+\"[^\"]+\"\s*\.\s*([^}]*)}}")
-    indent_pattern = re.compile(r"\|\s*(nindent|indent)\s+\d+")
-
-    for root, _, files in os.walk(templates_dir):
-        for file in files:
-            if not file.endswith((".yaml", ".tpl")):
-                continue
-
-            filepath = os.path.join(root, file)
-
-            with open(filepath, "r") as f:
-                lines = f.readlines()
-
-            for i, line in enumerate(lines):
-                if "include" not in line:
-                    continue
-
-                stripped = line.strip()
-
-                # 🔹 Include inline → pas de règle d'indentation
-                if not (stripped.startswith("{{") and stripped.endswith("}}")):
-                    continue
-
-                match = include_pattern.search(line)
-                if not match:
-                    continue
-
-                pipe_section = match.group(1)
-
-                # Include seul sur sa ligne → indent requis
-                if "|" not in pipe_section:
-                    violations.append(
-                        f"{filepath}:{i+1} → include seul sur sa ligne sans '| indent N' ou '| nindent N'."
-                    )
-                    continue
-
-                if not indent_pattern.search(pipe_section):
-                    violations.append(
-                        f"{filepath}:{i+1} → include seul sur sa ligne avec pipe mais sans indent/nindent valide."
-                    )
+    # fichiers routés (FILES) du dossier templates/ de la chart elle-même, hors sous-charts
+    for filepath in yaml_files:
+        if not filepath.startswith(templates_dir + os.sep) or not filepath.endswith((".yaml", ".tpl")):
+            continue
+
+        for line_number, kind in context.run_file_check(check_file, filepath)["violations"]:
+            if kind == "no_pipe":
+                violations.append(
+                    f"{filepath}:{line_number} → include seul sur sa ligne sans '| indent N' ou '| nindent N'."
+                )
+            else:
+                violations.append(
+                    f"{filepath}:{line_number} → include seul sur sa ligne avec pipe mais sans indent/nindent valide."
+                )
 
     return {
         "name": "include_indent_required",
@@ -1,8 +1,12 @@
 import yaml
-import os
 import re
 
-def check(yaml_files, chart):
+NAME = "chart_name_format"
+SCOPE = "chart"
+FILES = ("chart_yaml",)
+VERSION = "1"
+
+def check(yaml_files, chart, context):
     """
     Compatible avec main() qui fournit une liste de fichiers YAML d'une chart.
 
@@ -10,7 +14,7 @@ def check(yaml_files, chart):
         ^[a-z0-9-]+$
     """
 
-    if not yaml_files:
+    if not context.yaml_files:
         return {
             "name": "chart_name_format",
             "success": True,
@@ -18,18 +22,10 @@ def check(yaml_files, chart):
             "details": "Aucun fichier YAML fourni, check ignoré."
         }
 
-    # On retrouve le chemin racine de la chart
-    # Exemple : charts/mychart/templates/deployment.yaml → charts/mychart
-    chart_path = os.path.dirname(yaml_files[0])
-    while chart_path and os.path.basename(chart_path) not in ("charts", ""):
-        parent = os.path.dirname(chart_path)
-        if os.path.basename(parent) == "charts":
-            break
-        chart_path = parent
-
-    chart_file = os.path.join(chart_path, "Chart.yaml")
+    # Chart.yaml à la racine de la chart (analysé une seule fois par le contexte)
+    metadata = context.metadata(chart)
 
-    if not os.path.exists(chart_file):
+    if metadata is None:
         return {
             "name": "chart_name_format",
             "success": True,
@@ -38,8 +34,9 @@ def check(yaml_files, chart):
         }
 
     try:
-        with open(chart_file, "r") as f:
-            data = yaml.safe_load(f)
+        if metadata.error is not None:
+            raise metadata.error
+        data = metadata.data
 
         if not isinstance(data, dict):
             return {
@@ -49,7 +46,7 @@ def check(yaml_files, chart):
                 "details": "Le fichier Chart.yaml n'est pas un dictionnaire YAML."
             }
 
-        name = data.get("name")
+        name = metadata.name
 
         if not name:
             return {
@@ -1,8 +1,42 @@
 import os
 import re
 
+from line_rules import LineRule, register, scan_file
 
-def check(yaml_files, chart):
+NAME = "namespaced_template_definitions"
+SCOPE = "file"
+FILES = ("template", "helper")
+VERSION = "1"
+
+# Pattern pour extraire les définitions : {{- define "xxxx" }}
+define_pattern = re.compile(r'{{-\s*define\s+"([^"]+)"\s*}')
+
+def non_namespaced_definition(line):
+    """
+    Nom du template défini sur la ligne s'il n'est pas namespaced, sinon None.
+    """
+    match = define_pattern.search(line)
+    # Vérifier que le nom contient au moins un point (namespaced)
+    if match and "." not in match.group(1):
+        return match.group(1)
+    return None
+
+
+NON_NAMESPACED_DEFINITIONS = register(
+    LineRule("non_namespaced_definitions", ["define"], match=non_namespaced_definition)
+)
+
+
+def check_file(file, context):
+    """
+    Retourne les définitions de template non namespaced d'un fichier,
+    sous la forme de couples (numéro de ligne, nom du template).
+    """
+    hits = scan_file(file, context)[NON_NAMESPACED_DEFINITIONS.name]
+    return {"violations": [[line_number, template_name] for line_number, template_name in hits]}
+
+
+def check(yaml_files, chart, context):
     """
     Vérifie que chaque définition de template dans les fichiers .tpl
     utilise un nom namespaced (c'est à dire contenant au moins un point).
@@ -20,7 +54,7 @@ def check(yaml_files, chart):
     # Le dossier templates est à l'intérieur de la chart
     templates_dir = os.path.join(chart, "templates")
 
-    if not os.path.exists(templates_dir):
+    if not context.exists(templates_dir):
         return {
             "name": "namespaced_template_definitions",
             "success": True,
@@ -30,36 +64,25 @@ def check(yaml_files, chart):
 
     violations = []
 
-    # Pattern pour extraire les définitions : {{- define "xxxx" }}
-    define_pattern = re.compile(r'{{-\s*define\s+"([^"]+)"\s*}')
-
-    for root, _, files in os.walk(templates_dir):
-        for file in files:
-            # Vérifier les fichiers .tpl et .yaml
-            if not file.endswith((".tpl", ".yaml")):
-                continue
-
-            filepath = os.path.join(root, file)
-
-            try:
-                with open(filepath, "r", encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-
-                for i, line in enumerate(lines):
-                    match = define_pattern.search(line)
-                    if match:
-                        template_name = match.group(1)
-                        # Vérifier que le nom contient au moins un point (namespaced)
-                        if "." not in template_name:
-                            violations.append(
-                                f"{filepath}:{i+1} → Template '{template_name}' n'est pas namespaced "
-                                "(doit contenir un point, ex: chart.name)."
-                            )
-            except Exception as e:
-                violations.append(
-                    f"{filepath} → Erreur lors de la lecture: {str(e)}"
-                )
+    # Fichiers routés (FILES) du dossier templates/ de la chart elle-même, hors sous-charts
+    for filepath in yaml_files:
+        # Vérifier les fichiers .tpl et .yaml
+        if not filepath.startswith(templates_dir + os.sep) or not filepath.endswith((".tpl", ".yaml")):
+            continue
+
+        try:
+            result = context.run_file_check(check_file, filepath)
+        except Exception as e:
+            violations.append(
+                f"{filepath} → Erreur lors de la lecture: {str(e)}"
+            )
+            continue
+
+        for line_number, template_name in result["violations"]:
+            violations.append(
+                f"{filepath}:{line_number} → Template '{template_name}' n'est pas namespaced "
+                "(doit contenir un point, ex: chart.name)."
+            )
 
     success = len(violations) == 0
 
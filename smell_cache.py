@@ -0,0 +1,131 @@
+"""
+Cache disque des résultats des checks, adressé par le contenu des fichiers.
+
+Chaque résultat d'un check "par fichier" (SCOPE = "file") est stocké sous la
+clé (identifiant du blob, nom du check, empreinte du code source du check) :
+un fichier inchangé depuis la dernière exécution n'est donc pas ré-analysé,
+et modifier un check invalide automatiquement ses anciens résultats.
+L'identifiant de blob est calculé comme celui de git, ce qui permet de
+réutiliser directement les identifiants fournis par `git ls-tree`.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+
+CACHE_FOLDER = ".smell_cache"
+CACHE_FILE = "results.sqlite"
+DEFAULT_CACHE_PATH = os.path.join(CACHE_FOLDER, CACHE_FILE)
+
+# A incrémenter si la façon dont chart_context découpe les fichiers change
+CACHE_FORMAT_VERSION = "1"
+
+# Moteur commun des règles par ligne : le modifier invalide aussi les résultats des checks
+LINE_RULES_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "line_rules.py")
+
+
+def blob_id(data):
+    """Identifiant git (sha1) d'un blob à partir de son contenu brut."""
+    header = b"blob %d\0" % len(data)
+    return hashlib.sha1(header + data).hexdigest()
+
+
+class SmellCache:
+    def __init__(self, path=None):
+        if path is None:
+            path = DEFAULT_CACHE_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._versions = {}
+
+        # timeout : plusieurs workers du mode --jobs peuvent écrire en même temps
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_results (
+                blob TEXT NOT NULL,
+                check_name TEXT NOT NULL,
+                check_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (blob, check_name, check_version)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def check_version(self, check_file):
+        """Empreinte du fichier source qui définit `check_file` et de line_rules.py."""
+        source_path = check_file.__code__.co_filename
+        version = self._versions.get(source_path)
+        if version is None:
+            digest = hashlib.sha1(CACHE_FORMAT_VERSION.encode())
+            for path in (source_path, LINE_RULES_SOURCE):
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            version = digest.hexdigest()
+            self._versions[source_path] = version
+        return version
+
+    def get(self, blob, check_file):
+        row = self.connection.execute(
+            "SELECT result FROM file_results WHERE blob = ? AND check_name = ? AND check_version = ?",
+            (blob, check_file.__module__, self.check_version(check_file)),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, blob, check_file, result):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?)",
+            (blob, check_file.__module__, self.check_version(check_file), json.dumps(result)),
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+class BlobMemo:
+    """
+    Mémoire vive des résultats par blob, partagée entre les commits d'un même
+    dépôt lors du parcours de l'historique : un fichier qui garde le même blob
+    d'un commit à l'autre n'est ni relu depuis git ni ré-analysé.
+    `chart_results` garde, pour chaque (chart, check par chart), le dernier
+    résultat et les entrées dont il dépend, et `metadata` l'analyse de
+    chaque Chart.yaml (voir ChartContext.chart_yaml).
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.line_counts = {}
+        self.metadata = {}
+        self.chart_results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, blob, check_file):
+        result = self.results.get((blob, check_file))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, blob, check_file, result):
+        self.results[(blob, check_file)] = result
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def summary(self):
+        return f"{self.hits}/{self.hits + self.misses} résultats réutilisés ({self.hit_rate():.1%})"
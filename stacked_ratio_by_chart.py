@@ -1,7 +1,9 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 
+from figures import new_figure, save
+from results_store import ResultsStore
+
 # -------------------------
 # Setup
 # -------------------------
@@ -11,10 +13,9 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # -------------------------
 # Load data
 # -------------------------
-df = pd.read_csv("code_smells_by_practice.csv")
-
-# Convert ratio "x.xx%" -> float
-df["Ratio"] = df["Ratio"].astype(float)
+store = ResultsStore()
+df = pd.read_sql_query("SELECT * FROM by_practice", store.connection)
+store.close()
 
 # -------------------------
 # Pivot: Chart x Practice
@@ -29,32 +30,30 @@ pivot = pivot.drop(columns="TOTAL")
 # -------------------------
 # Plot stacked bar chart
 # -------------------------
-plt.figure(figsize=(14, 8))
+figure, ax = new_figure((14, 8))
 
 bottom = None
 for practice in pivot.columns:
     if bottom is None:
-        plt.bar(pivot.index, pivot[practice], label=practice)
+        ax.bar(pivot.index, pivot[practice], label=practice)
         bottom = pivot[practice]
     else:
-        plt.bar(pivot.index, pivot[practice], bottom=bottom, label=practice)
+        ax.bar(pivot.index, pivot[practice], bottom=bottom, label=practice)
         bottom = bottom + pivot[practice]
 
 # -------------------------
 # Styling
 # -------------------------
-plt.ylabel("ratio de mauvaises pratiques par ligne")
-plt.xlabel("Charts Helm")
-plt.title("Répartition des mauvaises pratiques par chart (ratios empilés)")
-plt.xticks(rotation=90)
-plt.legend(title="Mauvaise pratique", bbox_to_anchor=(1.02, 1), loc="upper left")
-plt.tight_layout()
+ax.set_ylabel("ratio de mauvaises pratiques par ligne")
+ax.set_xlabel("Charts Helm")
+ax.set_title("Répartition des mauvaises pratiques par chart (ratios empilés)")
+ax.tick_params(axis="x", labelrotation=90)
+ax.legend(title="Mauvaise pratique", bbox_to_anchor=(1.02, 1), loc="upper left")
 
 # -------------------------
 # Save
 # -------------------------
-plt.savefig(os.path.join(OUTPUT_DIR, "stacked_ratio_by_chart.png"))
-plt.close()
+save(figure, os.path.join(OUTPUT_DIR, "stacked_ratio_by_chart.png"))
 
 print("Graph generated in graphs_stacked/stacked_ratio_by_chart.png")
 # ============================================================
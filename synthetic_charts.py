@@ -0,0 +1,333 @@
+"""
+Générateur de charts Helm synthétiques pour les expériences de passage à
+l'échelle.
+
+Chaque chart est décrite par un ChartSpec (nombre de templates, clés de
+values.yaml et profondeur d'imbrication, paires define/include, mauvaises
+pratiques injectées) et `generate_chart` retourne, en plus des fichiers
+écrits, le résultat attendu de chaque check de scripts/ ainsi que le nombre
+de lignes et de fichiers YAML de la chart. Un corpus de N charts tirées au
+hasard (graine fixe) peut ainsi servir à mesurer le calculateur à 10× ou
+1000× la taille de charts/ tout en vérifiant les comptes exacts :
+
+    python synthetic_charts.py synthetic_corpus --charts 640 --validate
+"""
+import os
+import json
+import time
+import random
+import argparse
+from typing import NamedTuple
+
+GROUND_TRUTH_FILE = "ground_truth.json"
+
+
+class ChartSpec(NamedTuple):
+    name: str
+    templates: int = 10                 # templates/deployment*.yaml
+    values_keys: int = 20               # clés au niveau racine de values.yaml
+    nested_keys: int = 10               # dont clés ayant des enfants (objets imbriqués)
+    depth: int = 3                      # profondeur d'imbrication de ces clés
+    defines: int = 5                    # paires define (_helpers.tpl) / include (templates)
+    non_namespaced_defines: int = 0     # parmi les defines, noms sans point
+    includes_without_indent: int = 0    # include seuls sur leur ligne, sans indent/nindent
+    tabs: int = 0                       # lignes contenant une tabulation
+    configmap_secrets: int = 0          # clés sensibles en clair dans un ConfigMap
+    dependencies: int = 0               # dépendances de Chart.yaml
+    http_repositories: int = 0          # parmi les dépendances, repository en http://
+    nonrange_dependencies: int = 0      # parmi les dépendances, version fixée
+    unlabeled_templates: int = 0        # parmi les templates, sans les labels recommandés
+    invalid_name: bool = False          # nom de chart hors ^[a-z0-9-]+$
+    helper: bool = True                 # _helpers.tpl avec define "<chart>.labels"
+
+
+def _chart_yaml(spec):
+    lines = [
+        "apiVersion: v2",
+        f"name: {spec.name.replace('-', '_').title() if spec.invalid_name else spec.name}",
+        "description: Chart synthétique",
+        "type: application",
+        "version: 0.1.0",
+    ]
+    if spec.dependencies:
+        lines.append("dependencies:")
+        for i in range(spec.dependencies):
+            scheme = "http" if i < spec.http_repositories else "https"
+            version = f"1.{i}.0" if i < spec.nonrange_dependencies else f"~1.{i}.0"
+            lines += [
+                f"  - name: dependency{i}",
+                f'    version: "{version}"',
+                f"    repository: {scheme}://charts.example.com/dependency{i}",
+            ]
+    # les tabulations sont injectées dans des commentaires de Chart.yaml, lu par count_tabs
+    # mais ni par count_embedded ni par standard_labels
+    lines += [f"#\ttabulation {i}" for i in range(spec.tabs)]
+    return lines
+
+
+def _values_yaml(spec):
+    lines = ["# Valeurs par défaut de la chart synthétique"]
+    for key in range(spec.values_keys):
+        if key < spec.nested_keys and spec.depth > 0:
+            lines.append(f"nested{key}:")
+            lines.append(f"  # clé imbriquée {key}")
+            for level in range(1, spec.depth):
+                lines.append("  " * level + f"level{level}:")
+            lines.append("  " * spec.depth + f"value: {key}")
+            lines.append("  enabled: true")
+        else:
+            lines.append(f"scalar{key}: value{key}")
+    return lines
+
+
+def _helpers_tpl(spec):
+    prefix = spec.name
+    lines = [
+        f'{{{{- define "{prefix}.fullname" }}}}',
+        "{{ .Release.Name }}-{{ .Chart.Name }}",
+        "{{- end }}",
+        "",
+        f'{{{{- define "{prefix}.labels" }}}}',
+        "app.kubernetes.io/name: {{ .Chart.Name }}",
+        "app.kubernetes.io/instance: {{ .Release.Name }}",
+        "helm.sh/chart: {{ .Chart.Name }}-{{ .Chart.Version }}",
+        "app.kubernetes.io/managed-by: {{ .Release.Service }}",
+        "{{- end }}",
+    ]
+    for i in range(spec.defines):
+        lines += [
+            "",
+            f'{{{{- define "{_define_name(spec, i)}" }}}}',
+            f"helper: {i}",
+            "{{- end }}",
+        ]
+    return lines
+
+
+def _define_name(spec, i):
+    return f"helper{i}" if i < spec.non_namespaced_defines else f"{spec.name}.helper{i}"
+
+
+def _template(spec, index, includes, bare_includes):
+    lines = [
+        "apiVersion: apps/v1",
+        "kind: Deployment",
+        "metadata:",
+        f'  name: {{{{ include "{spec.name}.fullname" . }}}}-{index}',
+    ]
+    if index >= spec.unlabeled_templates:
+        lines += [
+            "  labels:",
+            f'    {{{{- include "{spec.name}.labels" . | nindent 4 }}}}',
+        ]
+    lines += [
+        "spec:",
+        "  replicas: 1",
+        "  template:",
+        "    metadata:",
+        "      annotations:",
+    ]
+    lines += [f'        {{{{ include "{name}" . | nindent 8 }}}}' for name in includes]
+    lines += [f'        {{{{ include "{name}" . }}}}' for name in bare_includes]
+    lines += [
+        "    spec:",
+        "      containers:",
+        "        - name: app",
+        '          image: "nginx:1.25"',
+    ]
+    return lines
+
+
+def _configmap(spec):
+    lines = [
+        "apiVersion: v1",
+        "kind: ConfigMap",
+        "metadata:",
+        f'  name: {{{{ include "{spec.name}.fullname" . }}}}-config',
+        "  labels:",
+        f'    {{{{- include "{spec.name}.labels" . | nindent 4 }}}}',
+        "data:",
+        # clés sensibles que le check doit ignorer
+        '  databasePassword: "{{ .Values.database.password }}"',
+        "  tokenFile: /var/run/secrets/token",
+        '  adminPassword: ""',
+        "  tokenEnabled: true",
+    ]
+    lines += [f'  secret{i}Password: "plain-{i}"' for i in range(spec.configmap_secrets)]
+    return lines
+
+
+def _spread(items, buckets):
+    """Répartit `items` sur `buckets` listes, à tour de rôle."""
+    spread = [[] for _ in range(buckets)]
+    for i, item in enumerate(items):
+        spread[i % buckets].append(item)
+    return spread
+
+
+def _write_lines(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def generate_chart(folder, spec):
+    """
+    Écrit la chart `spec` dans `folder` et retourne le résultat attendu :
+    {"checks": {NAME du check: code smells}, "lines": ..., "files": ...}.
+    """
+    if spec.templates == 0 and (spec.defines or spec.includes_without_indent):
+        raise ValueError(f"{spec.name} : les include sont écrits dans les templates, il en faut au moins un")
+
+    files = {
+        "Chart.yaml": _chart_yaml(spec),
+        "values.yaml": _values_yaml(spec),
+        os.path.join("templates", "configmap.yaml"): _configmap(spec),
+    }
+    helpers = _helpers_tpl(spec)
+    if spec.helper:
+        files[os.path.join("templates", "_helpers.tpl")] = helpers
+    else:
+        files[os.path.join("templates", "_definitions.tpl")] = helpers
+
+    includes = _spread([_define_name(spec, i) for i in range(spec.defines)], max(spec.templates, 1))
+    bare_includes = _spread([_define_name(spec, i % max(spec.defines, 1)) for i in range(spec.includes_without_indent)], max(spec.templates, 1))
+    for index in range(spec.templates):
+        files[os.path.join("templates", f"deployment{index}.yaml")] = _template(spec, index, includes[index], bare_includes[index])
+
+    lines = sum(_write_lines(os.path.join(folder, path), content) for path, content in files.items())
+    nested = spec.nested_keys if spec.depth > 0 else 0
+    return {
+        "checks": {
+            "configmap_sensitive_values": spec.configmap_secrets,
+            "count_tabs": spec.tabs,
+            "count_embedded_objects": min(nested, spec.values_keys),
+            "namespaced_template_definitions": spec.non_namespaced_defines,
+            "count_nonrange_versions": spec.nonrange_dependencies,
+            "chart_name_format": 1 if spec.invalid_name else 0,
+            "include_indent_required": spec.includes_without_indent,
+            "count_http_only_repositories": spec.http_repositories,
+            "has_helper_file": 0 if spec.helper else 1,
+            "standard_labels": spec.unlabeled_templates,
+        },
+        "lines": lines,
+        "files": sum(1 for path in files if path.endswith((".yaml", ".yml"))),
+    }
+
+
+def random_spec(rng, name, maxima):
+    """ChartSpec tirée au hasard, chaque quantité entre 0 et son maximum dans `maxima`."""
+    draw = lambda key: rng.randint(0, maxima[key])
+    templates = rng.randint(1, maxima["templates"])
+    values_keys = draw("values_keys")
+    dependencies = draw("dependencies")
+    defines = draw("defines")
+    return ChartSpec(
+        name=name,
+        templates=templates,
+        values_keys=values_keys,
+        nested_keys=rng.randint(0, values_keys),
+        depth=rng.randint(1, maxima["depth"]),
+        defines=defines,
+        non_namespaced_defines=rng.randint(0, defines),
+        includes_without_indent=draw("includes_without_indent"),
+        tabs=draw("tabs"),
+        configmap_secrets=draw("configmap_secrets"),
+        dependencies=dependencies,
+        http_repositories=rng.randint(0, dependencies),
+        nonrange_dependencies=rng.randint(0, dependencies),
+        unlabeled_templates=rng.randint(0, templates),
+        invalid_name=rng.random() < 0.1,
+        helper=rng.random() < 0.9,
+    )
+
+
+def generate_corpus(folder, count, seed, maxima):
+    """Écrit `count` charts synthétiques dans `folder`, avec leurs résultats attendus (ground_truth.json)."""
+    rng = random.Random(seed)
+    expected = {}
+    for i in range(count):
+        spec = random_spec(rng, f"synthetic-{i}", maxima)
+        chart = os.path.join(folder, spec.name)
+        expected[chart] = generate_chart(chart, spec)
+
+    with open(os.path.join(folder, GROUND_TRUTH_FILE), "w", encoding="utf-8") as f:
+        json.dump(expected, f, indent=2)
+    return expected
+
+
+def validate(expected):
+    """
+    Passe tous les checks sur chaque chart du corpus et compare au résultat
+    attendu. Retourne la liste des écarts.
+    """
+    from code_smells_calculator import load_check_functions, process_single_chart_detailed
+    import contextlib
+    import io
+
+    checks = load_check_functions()
+    mismatches = []
+    lines = 0
+    start = time.perf_counter()
+    for chart, truth in expected.items():
+        with contextlib.redirect_stdout(io.StringIO()): # détail des violations affiché par certains checks
+            result = process_single_chart_detailed(chart, checks)
+        lines += result["lines"]
+        for name, count in truth["checks"].items():
+            if result["by_practice"].get(name) != count:
+                mismatches.append(f"{chart} / {name} : {result['by_practice'].get(name)} au lieu de {count}")
+        for key in ("lines", "files"):
+            if result[key] != truth[key]:
+                mismatches.append(f"{chart} / {key} : {result[key]} au lieu de {truth[key]}")
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(expected)} charts, {lines} lignes analysées en {elapsed:.2f} s "
+          f"({len(expected) / elapsed:.1f} charts/s, {lines / elapsed:.0f} lignes/s)")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère un corpus de charts Helm synthétiques aux code smells connus.")
+    parser.add_argument("output", help="dossier dans lequel écrire les charts")
+    parser.add_argument(
+        "--charts",
+        type=int,
+        default=64,
+        help="nombre de charts à générer (défaut : 64, la taille de charts/)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="graine du tirage des charts"
+    )
+    defaults = {
+        "templates": 20, "values_keys": 100, "depth": 6, "defines": 20, "includes_without_indent": 5,
+        "tabs": 5, "configmap_secrets": 5, "dependencies": 10,
+    }
+    for key, value in defaults.items():
+        parser.add_argument(
+            f"--{key.replace('_', '-')}",
+            type=int,
+            default=value,
+            help=f"maximum tiré pour chaque chart (défaut : {value})"
+        )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="passe ensuite tous les checks sur le corpus et vérifie les comptes attendus"
+    )
+    args = parser.parse_args()
+
+    maxima = {key: getattr(args, key) for key in defaults}
+    expected = generate_corpus(args.output, args.charts, args.seed, maxima)
+    print(f"{len(expected)} charts générées dans {args.output}/ (résultats attendus dans {GROUND_TRUTH_FILE})")
+
+    if args.validate:
+        mismatches = validate(expected)
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        if mismatches:
+            raise SystemExit(f"{len(mismatches)} écarts avec les résultats attendus")
+        print("Tous les comptes correspondent aux résultats attendus.")